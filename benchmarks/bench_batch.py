@@ -0,0 +1,46 @@
+"""
+Measures the scaling of the BatchValuation with the number of worker processes on a synthetic book.
+Run from the repository root: python -m benchmarks.bench_batch
+"""
+
+import os
+import time
+import numpy as np
+from datetime import datetime
+
+from benchmarks.bench_var import build_portfolio
+from readers.economy_reader import EconomyReader
+from readers.mandate_reader import MandateReader
+from valuation.batch import BatchValuation
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def run(n_instruments: int = 20_000, n_economies: int = 8, shard_size: int = 1_000, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    economy = EconomyReader().read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+    mandate = MandateReader().read_mandate(os.path.join(INPUT_DIR, 'mandate'))
+    economies = [
+        economy.overlay(yield_curves={curve_id: yield_curve.shifted(rng.normal(0.0, 0.001, len(yield_curve.tenors)))
+                                      for curve_id, yield_curve in economy.yield_curves.items()})
+        for _ in range(n_economies)
+    ]
+    portfolio = build_portfolio(rng, economy.current_date, n_instruments)
+
+    print(f"* Batch valuation benchmark ({n_instruments} instruments, {n_economies} economies)")
+    expected, t_serial = None, None
+    n_workers = 1
+    while n_workers <= os.cpu_count():
+        start = time.perf_counter()
+        result = BatchValuation([portfolio], economies, mandate, n_workers, shard_size).run()
+        timing = time.perf_counter() - start
+        if expected is None:
+            expected, t_serial = result, timing
+        assert np.allclose(expected.values[0], result.values[0])
+        assert np.allclose(expected.exposures, result.exposures)
+        print(f"-- {n_workers} workers: {timing:.2f} s ({t_serial / timing:.1f}x)")
+        n_workers *= 2
+
+
+if __name__ == "__main__":
+    run()
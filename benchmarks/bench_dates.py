@@ -0,0 +1,45 @@
+"""
+Compares the per-element day-count path of DateHelper with the vectorized kernel on day ordinals.
+Run from the repository root: python -m benchmarks.bench_dates
+"""
+
+import timeit
+import numpy as np
+from datetime import datetime, timedelta
+
+from utils.dates import DateHelper
+
+
+def random_dates(n_dates: int, seed: int = 0) -> np.array:
+    rng = np.random.default_rng(seed)
+    offsets = rng.integers(0, 60 * 365, size=n_dates)
+    return np.array([datetime(2000, 1, 1) + timedelta(days=int(x)) for x in offsets])
+
+
+def per_element_tenors(date_helper: DateHelper, current_date: datetime, future_dates: np.array) -> np.array:
+    return np.array([date_helper.accrual_factor(current_date, x) for x in future_dates])
+
+
+def run(n_dates: int = 10_000, repeats: int = 20) -> None:
+    date_helper = DateHelper()
+    current_date = datetime(1999, 12, 31)
+    future_dates = random_dates(n_dates)
+    future_ordinals = date_helper.to_day_ordinals(future_dates)
+
+    # 1. Check that both paths agree bit-for-bit.
+    expected = per_element_tenors(date_helper, current_date, future_dates)
+    assert np.array_equal(expected, date_helper.tenors(current_date, future_dates))
+    assert np.array_equal(expected, date_helper.accrual_factors(current_date, future_ordinals))
+
+    # 2. Time both paths.
+    t_loop = timeit.timeit(lambda: per_element_tenors(date_helper, current_date, future_dates), number=repeats)
+    t_dt = timeit.timeit(lambda: date_helper.tenors(current_date, future_dates), number=repeats)
+    t_ord = timeit.timeit(lambda: date_helper.accrual_factors(current_date, future_ordinals), number=repeats)
+    print(f"* Day count benchmark ({n_dates} dates, {repeats} repeats)")
+    print(f"-- Per-element: {t_loop / repeats * 1e3:.3f} ms")
+    print(f"-- Vectorized (datetime): {t_dt / repeats * 1e3:.3f} ms ({t_loop / t_dt:.1f}x)")
+    print(f"-- Vectorized (ordinals): {t_ord / repeats * 1e3:.3f} ms ({t_loop / t_ord:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
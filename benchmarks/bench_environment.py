@@ -0,0 +1,55 @@
+"""
+Compares stepping the TradingEnvironment through instrument creation with the linearized mode.
+Run from the repository root: python -m benchmarks.bench_environment
+"""
+
+import os
+import time
+import numpy as np
+from datetime import datetime
+
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+from readers.mandate_reader import MandateReader
+from trading.environment import TradingEnvironment
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def run_episodes(env: TradingEnvironment, actions: np.array) -> tuple:
+    states, rewards = [], []
+    start = time.perf_counter()
+    for episode_actions in actions:
+        env.reset()
+        for action in episode_actions:
+            state, reward, _, _ = env.step(action)
+            states.append(state.copy())
+            rewards.append(reward)
+    return np.array(states), np.array(rewards), time.perf_counter() - start
+
+
+def run(episodes: int = 50, seed: int = 0) -> None:
+    economy = EconomyReader().read_economy(datetime.now(), os.path.join(INPUT_DIR, 'economy'))
+    mandate = MandateReader().read_mandate(os.path.join(INPUT_DIR, 'mandate'))
+    full_env = TradingEnvironment(mandate, economy, Portfolio())
+    fast_env = TradingEnvironment(mandate, economy, Portfolio(), linearized=True)
+    actions = np.random.default_rng(seed).uniform(-1.0, 1.0, (episodes, full_env.max_steps, mandate.n_instruments))
+
+    # 1. Check the linearized exposures against the full path.
+    full_states, full_rewards, full_time = run_episodes(full_env, actions)
+    fast_states, fast_rewards, fast_time = run_episodes(fast_env, actions)
+    assert np.allclose(full_states, fast_states, atol=1e-8)
+    assert np.allclose(full_rewards, fast_rewards, atol=1e-8)
+    assert np.allclose(
+        full_env.exposure_tracker.exposures, fast_env.exposure_tracker.exposures, rtol=1e-10, atol=1e-8
+    )
+
+    # 2. Compare step throughput.
+    n_steps = actions.shape[0] * actions.shape[1]
+    print(f"* Environment benchmark ({episodes} episodes, {n_steps} steps)")
+    print(f"-- full:       {n_steps / full_time:12.0f} steps/s")
+    print(f"-- linearized: {n_steps / fast_time:12.0f} steps/s ({full_time / fast_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
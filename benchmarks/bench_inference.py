@@ -0,0 +1,63 @@
+"""
+Compares rollout-time action sampling through a MultivariateNormal with autograd against the ActionSampler,
+for single observations and for batches of lockstep environments.
+Run from the repository root: python -m benchmarks.bench_inference
+"""
+
+import time
+import torch
+import numpy as np
+from torch.distributions import MultivariateNormal
+
+from ppo.networks import ActorNN
+from ppo.inference import ActionSampler
+
+
+def sample_multivariate_normal(actor: ActorNN, obs: np.array, cov_mat: torch.Tensor) -> tuple:
+    # Sampling as previously done by the rollout manager.
+    mean = actor(obs)
+    dist = MultivariateNormal(mean, cov_mat)
+    action = dist.sample()
+    log_prob = dist.log_prob(action)
+    return action.detach().numpy(), log_prob.detach().numpy()
+
+
+def actions_per_second(sample, observations: np.array) -> float:
+    start = time.perf_counter()
+    for obs in observations:
+        sample(obs)
+    return observations.shape[0] * observations.shape[1] / (time.perf_counter() - start)
+
+
+def run(obs_dim: int = 12, act_dim: int = 4, n_steps: int = 5_000, batch_sizes: tuple = (1, 8, 32),
+        seed: int = 0) -> None:
+    torch.manual_seed(seed)
+    actor = ActorNN(obs_dim, act_dim)
+    cov_mat = torch.diag(torch.full(size=(act_dim,), fill_value=0.6 ** 2))
+    rng = np.random.default_rng(seed)
+
+    # 1. Check the diagonal log densities against the multivariate normal.
+    sampler = ActionSampler(actor, batch_sizes[-1], obs_dim, act_dim)
+    sampler.set_covariance(cov_mat)
+    obs = rng.uniform(-1.0, 1.0, (batch_sizes[-1], obs_dim)).astype(np.float32)
+    actions, log_probs = sampler.sample(obs)
+    with torch.no_grad():
+        expected = MultivariateNormal(actor(obs), cov_mat).log_prob(torch.from_numpy(actions)).numpy()
+    assert np.allclose(log_probs, expected, rtol=1e-5, atol=1e-4)
+
+    # 2. Compare sampling throughput.
+    print(f"* Inference benchmark ({n_steps} steps per batch size)")
+    for batch_size in batch_sizes:
+        observations = rng.uniform(-1.0, 1.0, (n_steps, batch_size, obs_dim)).astype(np.float32)
+        baseline = actions_per_second(lambda x: sample_multivariate_normal(actor, x, cov_mat), observations)
+        print(f"-- batch {batch_size:3d} multivariate normal: {baseline:12.0f} actions/s")
+        for jit in [False, True]:
+            sampler = ActionSampler(actor, batch_size, obs_dim, act_dim, jit=jit)
+            sampler.set_covariance(cov_mat)
+            throughput = actions_per_second(sampler.sample, observations)
+            label = "traced sampler:     " if jit else "sampler:            "
+            print(f"-- batch {batch_size:3d} {label}{throughput:12.0f} actions/s ({throughput / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
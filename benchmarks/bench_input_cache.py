@@ -0,0 +1,49 @@
+"""
+Compares parsing the input CSVs with reloading the parsed inputs from the InputCache.
+Run from the repository root: python -m benchmarks.bench_input_cache
+"""
+
+import os
+import tempfile
+import timeit
+from datetime import datetime
+
+from readers.economy_reader import EconomyReader
+from readers.input_cache import InputCache
+from readers.mandate_reader import MandateReader
+from readers.portfolio_reader import PortfolioReader
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def read_inputs(input_cache: InputCache = None) -> tuple:
+    economy = EconomyReader(input_cache).read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+    portfolio = PortfolioReader(input_cache).read_portfolio(os.path.join(INPUT_DIR, 'portfolio'))
+    mandate = MandateReader(input_cache).read_mandate(os.path.join(INPUT_DIR, 'mandate'))
+    return economy, portfolio, mandate
+
+
+def run(repeats: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as cache_dir:
+        input_cache = InputCache(cache_dir)
+        economy, portfolio, mandate = read_inputs()
+        cached_economy, cached_portfolio, cached_mandate = read_inputs(input_cache)
+
+        # 1. Check that the cached inputs value the same.
+        cached_economy, cached_portfolio, cached_mandate = read_inputs(input_cache)
+        assert input_cache.hits == 3
+        assert abs(portfolio.value(economy) - cached_portfolio.value(cached_economy)) < 1e-8
+        assert (mandate.portfolio_exposures(portfolio, economy) ==
+                cached_mandate.portfolio_exposures(cached_portfolio, cached_economy)).all()
+
+        # 2. Time parsing and cached loading.
+        t_parse = timeit.timeit(lambda: read_inputs(), number=repeats)
+        t_cache = timeit.timeit(lambda: read_inputs(input_cache), number=repeats)
+        print(f"* Input cache benchmark ({repeats} repeats)")
+        print(f"-- Parse: {t_parse / repeats * 1e3:.1f} ms")
+        print(f"-- Cached: {t_cache / repeats * 1e3:.1f} ms ({t_parse / t_cache:.1f}x)")
+        print(f"-- {input_cache}")
+
+
+if __name__ == "__main__":
+    run()
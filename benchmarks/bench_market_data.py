@@ -0,0 +1,67 @@
+"""
+Compares parsing the economy CSVs with reading dated economies from a memory mapped MarketDataStore.
+Run from the repository root: python -m benchmarks.bench_market_data
+"""
+
+import os
+import tempfile
+import timeit
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from readers.economy_reader import EconomyReader
+from readers.market_data_store import MarketDataStore
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def write_history(history_path: str, dates: pd.DatetimeIndex, seed: int = 0) -> None:
+    # Random walks around the snapshot in io/input/economy, one block of rows per date.
+    rng = np.random.default_rng(seed)
+    for csv, scale in [("yield_curves.csv", 0.0005), ("share_prices.csv", 0.01), ("exchange_rates.csv", 0.005)]:
+        snapshot_df = pd.read_csv(os.path.join(INPUT_DIR, 'economy', csv))
+        moves = np.cumsum(rng.normal(0.0, scale, (len(dates), len(snapshot_df))), axis=0)
+        value_column = snapshot_df.columns[-1]
+        history_df = pd.concat([snapshot_df] * len(dates), ignore_index=True)
+        if csv == "yield_curves.csv":
+            history_df[value_column] += moves.ravel()
+        else:
+            history_df[value_column] *= np.exp(moves.ravel())
+        history_df.insert(0, "Date", np.repeat(dates.values, len(snapshot_df)))
+        history_df.to_csv(os.path.join(history_path, csv), index=False)
+
+
+def run(n_dates: int = 2500, repeats: int = 100) -> None:
+    reader = EconomyReader()
+    dates = pd.bdate_range(datetime(2012, 1, 2), periods=n_dates)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        history_path, store_path = os.path.join(tmp_dir, 'history'), os.path.join(tmp_dir, 'store')
+        os.makedirs(history_path)
+        write_history(history_path, dates)
+        t_build = timeit.timeit(lambda: MarketDataStore.build(history_path, store_path), number=1)
+        store = MarketDataStore(store_path)
+
+        # 1. Check a stored date against the history file and a weekend against the previous Friday.
+        date = dates[n_dates // 2].to_pydatetime()
+        curve_df = pd.read_csv(os.path.join(history_path, 'yield_curves.csv'), parse_dates=[0])
+        curve_df = curve_df[curve_df.iloc[:, 0] == date]
+        economy = store.economy(date)
+        for curve_id, yield_curve in economy.yield_curves.items():
+            assert np.allclose(yield_curve.yields, curve_df[curve_df.iloc[:, 1] == curve_id].iloc[:, 4])
+        friday = dates[dates.weekday == 4][0]
+        assert store.row(friday + pd.Timedelta(days=2)) == store.row(friday)
+
+        # 2. Time parsing the CSV snapshot and reading random dates from the store.
+        rng = np.random.default_rng(0)
+        random_dates = [x.to_pydatetime() for x in dates[rng.integers(0, n_dates, repeats)]]
+        t_csv = timeit.timeit(lambda: reader.read_economy(date, os.path.join(INPUT_DIR, 'economy')), number=repeats)
+        t_store = timeit.timeit(lambda: [store.economy(x) for x in random_dates], number=1)
+        print(f"* Market data benchmark ({n_dates} dates, {repeats} repeats)")
+        print(f"-- Build store: {t_build:.2f} s")
+        print(f"-- CSV snapshot: {t_csv / repeats * 1e3:.2f} ms per economy")
+        print(f"-- Store: {t_store / repeats * 1e3:.2f} ms per economy ({t_csv / t_store:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,78 @@
+"""
+Compares reading a large synthetic book row by row with the bulk PortfolioReader. Both create an instrument
+object per row, the bulk reader saves the per row data frame access and keyword argument handling.
+Run from the repository root: python -m benchmarks.bench_portfolio_reader
+"""
+
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+from readers.portfolio_reader import PortfolioReader
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def write_book(file_path: str, n_rows: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    is_stock = rng.random(n_rows) < 0.5
+    maturities = pd.to_datetime("2021-01-01") + pd.to_timedelta(rng.integers(365, 30 * 365, n_rows), unit="D")
+    pd.DataFrame({
+        "Identifier": [f"trade_{k}" for k in range(n_rows)],
+        "Instrument Type": np.where(is_stock, "Stock", "ZeroCouponBond"),
+        "Discount Curve Quote": np.where(is_stock, None, "EUR_EONIA_1D"),
+        "Discount Curve Base": None,
+        "Forecast Curve Quote": None,
+        "Forecast Curve Base": None,
+        "Notional": rng.uniform(-1e4, 1e4, n_rows).round(2),
+        "Start Date": np.where(is_stock, None, "1/1/2021"),
+        "Maturity Date": np.where(is_stock, None, maturities.strftime("%m/%d/%Y")),
+        "Quote Currency": "EUR",
+        "Base Currency": None,
+        "Ticker Symbol": np.where(is_stock, "SX5E", None)
+    }).to_csv(file_path, index=False)
+
+
+def read_row_by_row(reader: PortfolioReader, file_path: str) -> Portfolio:
+    # The per row iloc loop the bulk reader replaces.
+    portfolio_df, instruments = pd.read_csv(file_path), []
+    for k in range(len(portfolio_df)):
+        kwargs = {"quote_currency": portfolio_df.iloc[k, 9]}
+        if not pd.isnull(portfolio_df.iloc[k, 2]):
+            kwargs["discount_curve_id"] = portfolio_df.iloc[k, 2]
+        if not pd.isnull(portfolio_df.iloc[k, 6]):
+            kwargs["notional"] = portfolio_df.iloc[k, 6]
+        for name, idx in [("start_date", 7), ("maturity_date", 8)]:
+            if not pd.isnull(portfolio_df.iloc[k, idx]):
+                kwargs[name] = pd.to_datetime(portfolio_df.iloc[k, idx])
+        if not pd.isnull(portfolio_df.iloc[k, 11]):
+            kwargs["ticker_symbol"] = portfolio_df.iloc[k, 11]
+        instruments.append(reader.instrument_factory.create_instrument(portfolio_df.iloc[k, 1], **kwargs))
+    return Portfolio(instruments)
+
+
+def run(n_rows: int = 50_000) -> None:
+    economy = EconomyReader().read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+    reader = PortfolioReader()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, "portfolio.csv")
+        write_book(file_path, n_rows)
+        start = time.perf_counter()
+        expected = read_row_by_row(reader, file_path)
+        t_rows = time.perf_counter() - start
+        start = time.perf_counter()
+        portfolio = reader.read_portfolio_file(file_path, chunk_size=10_000)
+        t_bulk = time.perf_counter() - start
+    assert np.allclose(expected.instrument_values(economy), portfolio.instrument_values(economy))
+    print(f"* Portfolio reader benchmark ({n_rows} rows)")
+    print(f"-- Row by row: {t_rows:.2f} s")
+    print(f"-- Bulk: {t_bulk:.2f} s ({t_rows / t_bulk:.1f}x)")
+
+
+if __name__ == "__main__":
+    run()
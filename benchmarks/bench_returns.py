@@ -0,0 +1,53 @@
+"""
+Compares the rewards-to-go loop with list insertions against the vectorized discounted returns,
+and checks that GAE with lambda = 1 reproduces the bootstrapped returns.
+Run from the repository root: python -m benchmarks.bench_returns
+"""
+
+import time
+import numpy as np
+
+from ppo.returns import discounted_returns, generalized_advantages
+
+
+def rewards_to_go(batch_rews: list, gamma: float) -> list:
+    # Rewards-to-go as previously computed by the rollout manager.
+    batch_rtgs = []
+    for ep_rews in reversed(batch_rews):
+        discounted_reward = 0
+        for rew in reversed(ep_rews):
+            discounted_reward = rew + discounted_reward * gamma
+            batch_rtgs.insert(0, discounted_reward)
+    return batch_rtgs
+
+
+def run(n_steps: int = 200_000, max_episode_steps: int = 10, gamma: float = 0.99, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    lens = rng.integers(1, max_episode_steps + 1, n_steps)
+    lens = lens[:np.searchsorted(np.cumsum(lens), n_steps)]
+    rews = rng.normal(size=np.sum(lens))
+    batch_rews = np.split(rews, np.cumsum(lens)[:-1])
+
+    # 1. Check the vectorized returns against the loop.
+    start = time.perf_counter()
+    loop_rtgs = np.array(rewards_to_go(batch_rews, gamma))
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    rtgs = discounted_returns(rews, lens, gamma)
+    vectorized_time = time.perf_counter() - start
+    assert np.allclose(rtgs, loop_rtgs)
+
+    # 2. Check that GAE(lambda = 1) advantages are the bootstrapped returns in excess of the values.
+    values, bootstrap_values = rng.normal(size=rews.shape), rng.normal(size=lens.shape)
+    advantages, returns = generalized_advantages(rews, values, bootstrap_values, lens, gamma, 1.0)
+    assert np.allclose(returns, discounted_returns(rews, lens, gamma, bootstrap_values))
+    assert np.allclose(advantages, returns - values)
+
+    # 3. Compare timings.
+    print(f"* Returns benchmark ({len(rews)} steps, {len(lens)} episodes)")
+    print(f"-- insertion loop: {loop_time:.3f} s")
+    print(f"-- vectorized:     {vectorized_time:.3f} s ({loop_time / vectorized_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    run()
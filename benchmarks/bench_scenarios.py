@@ -0,0 +1,53 @@
+"""
+Compares valuing instruments under many yield curve scenarios one curve at a time with a single YieldCurveSet.
+Run from the repository root: python -m benchmarks.bench_scenarios
+"""
+
+import timeit
+import numpy as np
+from datetime import datetime
+
+from economy.observables.interest_rate import InterestRate
+from economy.term_structures.yield_curve import YieldCurve
+from economy.term_structures.yield_curve_set import YieldCurveSet
+from instruments.cash.debt import FixedRateBond, FloatingRateBond
+from instruments.derivatives.swaps import InterestRateSwap
+
+
+def run(n_scenarios: int = 1000, repeats: int = 5, seed: int = 0) -> None:
+    current_date = datetime(2021, 1, 4)
+    tenors = np.array([0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0])
+    yield_curve = YieldCurve("EUR-ESTR", "EUR", tenors, np.linspace(0.01, 0.03, len(tenors)))
+    yield_shifts = np.random.default_rng(seed).normal(0.0, 0.001, (n_scenarios, len(tenors)))
+    yield_curve_set = YieldCurveSet.from_shifts(yield_curve, yield_shifts)
+    scenarios = [yield_curve_set.scenario(idx) for idx in range(n_scenarios)]
+
+    fixed_rate = InterestRate(identifier="FIX", value=0.02, currency="EUR")
+    instruments = {
+        "FixedRateBond": lambda curve: FixedRateBond(
+            "EUR", "EUR-ESTR", 1e6, datetime(2020, 1, 4), datetime(2040, 1, 4), "6M", fixed_rate
+        ).value(current_date, curve),
+        "FloatingRateBond": lambda curve: FloatingRateBond(
+            "EUR", "EUR-ESTR", "EUR-ESTR", 1e6, datetime(2020, 1, 4), datetime(2040, 1, 4), "3M"
+        ).value(current_date, curve, curve),
+        "InterestRateSwap": lambda curve: InterestRateSwap(
+            "EUR", "EUR-ESTR", "EUR-ESTR", 1e6, current_date, datetime(2041, 1, 4), fixed_rate, "1Y", "3M", "Payer",
+            swap_rate=0.02
+        ).value(current_date, curve, curve)
+    }
+
+    print(f"* Scenario valuation benchmark ({n_scenarios} scenarios, {repeats} repeats)")
+    for name, value in instruments.items():
+        # 1. Check the batched present values against one valuation per scenario.
+        expected = np.array([value(curve) for curve in scenarios])
+        assert np.allclose(expected, value(yield_curve_set), rtol=1e-10, atol=1e-6)
+
+        # 2. Time the loop over scenarios and the batched valuation.
+        t_loop = timeit.timeit(lambda: [value(curve) for curve in scenarios], number=repeats)
+        t_set = timeit.timeit(lambda: value(yield_curve_set), number=repeats)
+        print(f"-- {name}: loop {t_loop / repeats * 1e3:.1f} ms, set {t_set / repeats * 1e3:.3f} ms "
+              f"({t_loop / t_set:.0f}x)")
+
+
+if __name__ == "__main__":
+    run()
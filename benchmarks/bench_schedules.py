@@ -0,0 +1,43 @@
+"""
+Compares the relativedelta loop for payment date schedules with the vectorized, cached DateScheduleGenerator.
+Run from the repository root: python -m benchmarks.bench_schedules
+"""
+
+import timeit
+import numpy as np
+from datetime import datetime
+
+from utils.dates import DateScheduleGenerator, DateScheduleCache
+
+
+def loop_payment_dates(generator: DateScheduleGenerator, start_date: datetime, end_date: datetime) -> np.array:
+    payment_dates, counter = [], 0
+    while end_date - counter * generator.payment_freq_delta > start_date:
+        payment_dates.insert(0, end_date - counter * generator.payment_freq_delta)
+        counter += 1
+    return np.array(payment_dates, dtype="datetime64[us]")
+
+
+def run(payment_freq: str = "1M", years: int = 50, repeats: int = 100) -> None:
+    start_date, end_date = datetime(2001, 1, 31), datetime(2001 + years, 1, 31)
+    uncached = DateScheduleGenerator(payment_freq, schedule_cache=None)
+    cache = DateScheduleCache()
+    cached = DateScheduleGenerator(payment_freq, schedule_cache=cache)
+
+    # 1. Check that the vectorized schedule matches the relativedelta loop.
+    expected = loop_payment_dates(uncached, start_date, end_date)
+    assert np.array_equal(expected, uncached.date_schedule(start_date, end_date).payment_dates)
+
+    # 2. Time the loop, the vectorized generation and cached look-ups.
+    t_loop = timeit.timeit(lambda: loop_payment_dates(uncached, start_date, end_date), number=repeats)
+    t_vec = timeit.timeit(lambda: uncached.date_schedule(start_date, end_date), number=repeats)
+    t_cache = timeit.timeit(lambda: cached.date_schedule(start_date, end_date), number=repeats)
+    print(f"* Date schedule benchmark ({len(expected)} payments, {repeats} repeats)")
+    print(f"-- Loop: {t_loop / repeats * 1e3:.3f} ms")
+    print(f"-- Vectorized: {t_vec / repeats * 1e3:.3f} ms ({t_loop / t_vec:.1f}x)")
+    print(f"-- Cached: {t_cache / repeats * 1e3:.3f} ms ({t_loop / t_cache:.1f}x)")
+    print(f"-- {cache}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,51 @@
+"""
+Times generating a scenario bank with the EconomySimulator and stepping the TradingEnvironment through it.
+Run from the repository root: python -m benchmarks.bench_simulation
+"""
+
+import os
+import time
+import numpy as np
+from datetime import datetime
+
+from economy.simulation import EconomySimulator
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+from readers.mandate_reader import MandateReader
+from trading.environment import TradingEnvironment
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def run(n_paths: int = 10_000, episodes: int = 20, seed: int = 0) -> None:
+    economy = EconomyReader().read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+    mandate = MandateReader().read_mandate(os.path.join(INPUT_DIR, 'mandate'))
+    static_env = TradingEnvironment(mandate, economy, Portfolio(netting=True))
+
+    # 1. Generate all paths at once.
+    start = time.perf_counter()
+    scenario_bank = EconomySimulator(economy).generate(n_paths, static_env.max_steps, seed)
+    t_generate = time.perf_counter() - start
+    assert all(np.allclose(x[:, 0], economy.yield_curves[key].yields) for key, x in scenario_bank.yields.items())
+
+    # 2. Compare stepping through the static economy and through sampled paths.
+    env = TradingEnvironment(mandate, economy, Portfolio(netting=True), scenario_bank=scenario_bank)
+    env.seed(seed)
+    actions = np.random.default_rng(seed).uniform(-1.0, 1.0, (episodes, env.max_steps, mandate.n_instruments))
+    timings = {}
+    for name, environment in [("static", static_env), ("scenarios", env)]:
+        start = time.perf_counter()
+        for episode_actions in actions:
+            environment.reset()
+            for action in episode_actions:
+                environment.step(action)
+        timings[name] = time.perf_counter() - start
+    n_steps = actions.shape[0] * actions.shape[1]
+    print(f"* Scenario bank benchmark ({n_paths} paths of {env.max_steps} steps)")
+    print(f"-- Generate: {t_generate:.3f} s ({n_paths * env.max_steps / t_generate:.0f} economy steps/s)")
+    for name, timing in timings.items():
+        print(f"-- {name}: {n_steps / timing:.0f} environment steps/s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,38 @@
+"""
+Tracks the cold import time of the valuation-only and the training entry points in fresh interpreters,
+and checks that the valuation path loads neither plotting, RL nor parsing libraries.
+Run from the repository root: python -m benchmarks.bench_startup
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ["torch", "gym", "matplotlib", "pandas"]
+ENTRY_POINTS = {
+    "valuation": "import main; from risk.historical import HistoricalSimulation",
+    "training": "import main; from trading.trainer import PolicyTrainer",
+}
+
+
+def import_time(statement: str) -> dict:
+    code = f"import sys, time, json; start = time.perf_counter(); {statement}; " \
+           f"print(json.dumps({{'seconds': time.perf_counter() - start, " \
+           f"'heavy': [x for x in {HEAVY_MODULES!r} if x in sys.modules]}}))"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def run(repeats: int = 5) -> None:
+    print(f"* Startup benchmark (best of {repeats} cold imports)")
+    for name, statement in ENTRY_POINTS.items():
+        results = [import_time(statement) for _ in range(repeats)]
+        print(f"-- {name}: {min(x['seconds'] for x in results) * 1e3:.0f} ms, heavy modules {results[0]['heavy']}")
+        if name == "valuation":
+            assert not results[0]["heavy"], f"Valuation path imports {results[0]['heavy']}!"
+
+
+if __name__ == "__main__":
+    run()
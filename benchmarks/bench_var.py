@@ -0,0 +1,87 @@
+"""
+Compares the chunked historical simulation with revaluing the portfolio in one economy per scenario.
+Run from the repository root: python -m benchmarks.bench_var
+"""
+
+import os
+import time
+import numpy as np
+from datetime import datetime
+
+from economy.observables.exchange_rate import ExchangeRate
+from economy.observables.interest_rate import InterestRate
+from economy.observables.share_price import SharePrice
+from economy.scenarios import MarketShocks
+from instruments.cash.debt import FixedRateBond, FloatingRateBond, ZeroCouponBond
+from instruments.cash.equity import Stock
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+from risk.historical import HistoricalSimulation
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+def build_portfolio(rng: np.random.Generator, current_date: datetime, n_instruments: int) -> Portfolio:
+    curves = {"EUR": "EUR_EURIBOR_3M", "GBP": "GBP_LIBOR_3M", "USD": "USD_LIBOR_3M"}
+    tickers = {"EUR": "SX5E", "GBP": "UKX", "USD": "SPX"}
+    instruments = []
+    for _ in range(n_instruments):
+        currency = rng.choice(list(curves))
+        maturity_date = datetime(current_date.year + int(rng.integers(1, 30)), current_date.month, 1)
+        notional = float(rng.uniform(-1e6, 1e6))
+        kind = rng.integers(4)
+        if kind == 0:
+            instruments.append(Stock(currency, tickers[currency], notional / 1e3))
+        elif kind == 1:
+            instruments.append(ZeroCouponBond(currency, curves[currency], notional, current_date, maturity_date))
+        elif kind == 2:
+            fixed_rate = InterestRate(identifier="FIX", currency=currency, value=0.01)
+            instruments.append(FixedRateBond(currency, curves[currency], notional, current_date, maturity_date, "6M",
+                                             fixed_rate))
+        else:
+            instruments.append(FloatingRateBond(currency, curves[currency], curves[currency], notional, current_date,
+                                                maturity_date, "3M"))
+    return Portfolio(instruments)
+
+
+def run(n_scenarios: int = 500, n_instruments: int = 200, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    economy = EconomyReader().read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+    portfolio = build_portfolio(rng, economy.current_date, n_instruments)
+    market_shocks = MarketShocks(
+        yield_shifts={curve_id: rng.normal(0.0, 0.0005, (n_scenarios, len(yield_curve.tenors)))
+                      for curve_id, yield_curve in economy.yield_curves.items()},
+        share_price_returns={ticker: rng.normal(0.0, 0.01, n_scenarios) for ticker in economy.share_prices},
+        exchange_rate_returns={identifier: rng.normal(0.0, 0.005, n_scenarios) for identifier in economy.exchange_rates}
+    )
+    simulation = HistoricalSimulation(portfolio, economy, reporting_currency="EUR")
+
+    # 1. Revalue the portfolio in one scenario economy at a time.
+    start = time.perf_counter()
+    base_value, expected = simulation.value(economy), np.zeros(n_scenarios)
+    for k in range(n_scenarios):
+        scenario_economy = economy.overlay(
+            yield_curves={curve_id: economy.yield_curves[curve_id].shifted(shifts[k])
+                          for curve_id, shifts in market_shocks.yield_shifts.items()},
+            share_prices={ticker: SharePrice(ticker, x.currency, x.value * (1.0 + market_shocks.share_price_returns[ticker][k]))
+                          for ticker, x in economy.share_prices.items()},
+            exchange_rates={identifier: ExchangeRate(x.value * (1.0 + market_shocks.exchange_rate_returns[identifier][k]),
+                                                     x.base_currency, x.quote_currency)
+                            for identifier, x in economy.exchange_rates.items()}
+        )
+        expected[k] = simulation.value(scenario_economy) - base_value
+    t_loop = time.perf_counter() - start
+
+    # 2. Revalue all scenarios in chunks and check the profit and loss.
+    start = time.perf_counter()
+    report = simulation.report(market_shocks)
+    t_chunked = time.perf_counter() - start
+    assert np.allclose(expected, report.pnl, rtol=1e-8, atol=1e-4)
+    print(f"* Historical simulation benchmark ({n_scenarios} scenarios, {n_instruments} instruments)")
+    print(f"-- Loop: {t_loop:.2f} s")
+    print(f"-- Chunked: {t_chunked:.2f} s ({t_loop / t_chunked:.1f}x)")
+    print(f"-- {report}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,3 +1,5 @@
+from __future__ import annotations
+import numpy as np
 from typing import Dict
 from datetime import datetime
 
@@ -21,3 +23,31 @@ class Economy:
         self.share_prices = share_prices
         self.exchange_rates = exchange_rates
 
+    def overlay(
+            self,
+            yield_curves: Dict[str, YieldCurve] = None,
+            share_prices: Dict[str, SharePrice] = None,
+            exchange_rates: Dict[str, ExchangeRate] = None
+    ) -> Economy:
+        # Scenario economy which replaces the given observables and shares all others with this economy.
+        return Economy(
+            current_date=self.current_date,
+            yield_curves=self._overlay(self.yield_curves, yield_curves),
+            share_prices=self._overlay(self.share_prices, share_prices),
+            exchange_rates=self._overlay(self.exchange_rates, exchange_rates)
+        )
+
+    @property
+    def scenario_shape(self) -> tuple:
+        # Leading scenario axes of the observables, empty unless the economy holds scenarios, see MarketShocks.
+        return np.broadcast_shapes(
+            *[yield_curve.yields.shape[:-1] for yield_curve in self.yield_curves.values()],
+            *[np.shape(share_price.value) for share_price in self.share_prices.values()],
+            *[np.shape(exchange_rate.value) for exchange_rate in self.exchange_rates.values()]
+        )
+
+    @staticmethod
+    def _overlay(base: dict, replacements: dict) -> dict:
+        if not replacements:
+            return base
+        return {**base, **replacements}
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import numpy as np
+from typing import Dict
+
+from economy.base import Economy
+from economy.observables.exchange_rate import ExchangeRate
+from economy.observables.share_price import SharePrice
+from economy.term_structures.yield_curve_set import YieldCurveSet
+
+
+class MarketShocks:
+    """
+    Moves of the market observables over many scenarios: additive node yield shifts per curve of shape
+    (scenarios x tenors), and relative returns per share price and exchange rate of shape (scenarios,).
+    Observables without shocks are left unchanged in every scenario.
+    """
+
+    def __init__(
+            self,
+            yield_shifts: Dict[str, np.array] = None,
+            share_price_returns: Dict[str, np.array] = None,
+            exchange_rate_returns: Dict[str, np.array] = None
+    ) -> None:
+        self.yield_shifts = {} if yield_shifts is None else yield_shifts
+        self.share_price_returns = {} if share_price_returns is None else share_price_returns
+        self.exchange_rate_returns = {} if exchange_rate_returns is None else exchange_rate_returns
+        n_scenarios = {len(shocks) for shocks in self._all_shocks()}
+        if len(n_scenarios) > 1:
+            raise ValueError(f"Market shocks have different numbers of scenarios {sorted(n_scenarios)}!")
+        self.n_scenarios = n_scenarios.pop() if n_scenarios else 0
+
+    def _all_shocks(self) -> list:
+        return [*self.yield_shifts.values(), *self.share_price_returns.values(), *self.exchange_rate_returns.values()]
+
+    def chunk(self, start: int, stop: int) -> MarketShocks:
+        # Shocks of the scenarios in [start, stop), sharing memory with these shocks.
+        return MarketShocks(
+            yield_shifts={key: shocks[start:stop] for key, shocks in self.yield_shifts.items()},
+            share_price_returns={key: shocks[start:stop] for key, shocks in self.share_price_returns.items()},
+            exchange_rate_returns={key: shocks[start:stop] for key, shocks in self.exchange_rate_returns.items()}
+        )
+
+    def apply(self, economy: Economy) -> Economy:
+        # Scenario economy with a leading scenario axis on all shocked observables.
+        yield_curves = {
+            curve_id: YieldCurveSet.from_shifts(economy.yield_curves[curve_id], shifts)
+            for curve_id, shifts in self.yield_shifts.items()
+        }
+        share_prices = {}
+        for ticker_symbol, returns in self.share_price_returns.items():
+            share_price = economy.share_prices[ticker_symbol]
+            share_prices[ticker_symbol] = SharePrice(
+                ticker_symbol=ticker_symbol, currency=share_price.currency, value=share_price.value * (1.0 + returns)
+            )
+        exchange_rates = {}
+        for identifier, returns in self.exchange_rate_returns.items():
+            exchange_rate = economy.exchange_rates[identifier]
+            exchange_rates[identifier] = ExchangeRate(
+                value=exchange_rate.value * (1.0 + returns), base_currency=exchange_rate.base_currency,
+                quote_currency=exchange_rate.quote_currency
+            )
+        return economy.overlay(yield_curves=yield_curves, share_prices=share_prices, exchange_rates=exchange_rates)
+
+    @classmethod
+    def from_history(cls, yield_curve_history: Dict[str, np.array] = None, share_price_history: Dict[str, np.array] = None,
+                     exchange_rate_history: Dict[str, np.array] = None, horizon: int = 1) -> MarketShocks:
+        # Historical moves over the horizon from observations per date (rows), oldest first.
+        yield_curve_history = {} if yield_curve_history is None else yield_curve_history
+        share_price_history = {} if share_price_history is None else share_price_history
+        exchange_rate_history = {} if exchange_rate_history is None else exchange_rate_history
+        return cls(
+            yield_shifts={key: x[horizon:] - x[:-horizon] for key, x in yield_curve_history.items()},
+            share_price_returns={key: x[horizon:] / x[:-horizon] - 1.0 for key, x in share_price_history.items()},
+            exchange_rate_returns={key: x[horizon:] / x[:-horizon] - 1.0 for key, x in exchange_rate_history.items()}
+        )
@@ -0,0 +1,160 @@
+"""
+This module contains a stochastic simulator of economies, generating paths of yield curves,
+share prices and exchange rates into a scenario bank that environments step through.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from economy.base import Economy
+from economy.observables.exchange_rate import ExchangeRate
+from economy.observables.share_price import SharePrice
+from economy.term_structures.yield_curve import YieldCurve
+
+
+class ScenarioBank:
+    """
+    Pre-generated paths of an economy. Yields are stored per curve with shape (paths x steps + 1 x tenors),
+    share prices and exchange rates with shape (paths x steps + 1). Step 0 is the economy the paths start from.
+    """
+
+    def __init__(
+            self,
+            economy: Economy,
+            yields: Dict[str, np.array],
+            share_prices: Dict[str, np.array],
+            exchange_rates: Dict[str, np.array],
+            step_days: int = 1
+    ) -> None:
+        self.init_economy = economy
+        self.yields = yields
+        self.share_prices = share_prices
+        self.exchange_rates = exchange_rates
+        self.step_days = step_days
+        shapes = {x.shape[:2] for x in [*yields.values(), *share_prices.values(), *exchange_rates.values()]}
+        if len(shapes) != 1:
+            raise ValueError(f"Scenario bank paths have different shapes {sorted(shapes)}!")
+        self.n_paths, n_dates = shapes.pop()
+        self.n_steps = n_dates - 1
+
+    def economy(self, path: int, step: int) -> Economy:
+        current_date = self.init_economy.current_date + timedelta(days=step * self.step_days)
+        yield_curves = {}
+        for curve_id, yields in self.yields.items():
+            yield_curve = self.init_economy.yield_curves[curve_id]
+            yield_curves[curve_id] = YieldCurve(yield_curve.identifier, yield_curve.currency, yield_curve.tenors,
+                                                yields[path, step].copy(), yield_curve.date_helper)
+        share_prices = {
+            ticker_symbol: SharePrice(ticker_symbol, self.init_economy.share_prices[ticker_symbol].currency,
+                                      float(values[path, step]))
+            for ticker_symbol, values in self.share_prices.items()
+        }
+        exchange_rates = {}
+        for identifier, values in self.exchange_rates.items():
+            exchange_rate = self.init_economy.exchange_rates[identifier]
+            exchange_rates[identifier] = ExchangeRate(float(values[path, step]), exchange_rate.base_currency,
+                                                      exchange_rate.quote_currency)
+        return Economy(
+            current_date=current_date,
+            yield_curves={**self.init_economy.yield_curves, **yield_curves},
+            share_prices={**self.init_economy.share_prices, **share_prices},
+            exchange_rates={**self.init_economy.exchange_rates, **exchange_rates}
+        )
+
+    def sample_path(self, rng: np.random.Generator) -> int:
+        return int(rng.integers(self.n_paths))
+
+    def save(self, bank_path: str) -> None:
+        # The economy the paths start from is not saved, it is passed again on load.
+        arrays = {f"yields/{key}": x for key, x in self.yields.items()}
+        arrays.update({f"share_prices/{key}": x for key, x in self.share_prices.items()})
+        arrays.update({f"exchange_rates/{key}": x for key, x in self.exchange_rates.items()})
+        np.savez(bank_path, step_days=self.step_days, **arrays)
+
+    @classmethod
+    def load(cls, bank_path: str, economy: Economy) -> ScenarioBank:
+        fields = {"yields": {}, "share_prices": {}, "exchange_rates": {}}
+        with np.load(bank_path) as arrays:
+            for name in arrays.files:
+                if "/" in name:
+                    field, key = name.split("/", 1)
+                    fields[field][key] = arrays[name]
+            step_days = int(arrays["step_days"])
+        return cls(economy, fields["yields"], fields["share_prices"], fields["exchange_rates"], step_days)
+
+
+class EconomySimulator:
+    """
+    Vectorized simulation of an economy over all paths and steps at once.
+    Yield curves move with level, slope and curvature (Nelson-Siegel) factors per currency, share prices
+    follow geometric Brownian motions and exchange rates correlated log-normal processes. The drivers are
+    correlated through a single correlation matrix ordered as in drivers.
+    """
+
+    def __init__(
+            self,
+            economy: Economy,
+            factor_vols: tuple = (0.0080, 0.0100, 0.0120),
+            factor_decay: float = 2.0,
+            share_price_vol: float = 0.20,
+            share_price_drift: float = 0.0,
+            exchange_rate_vol: float = 0.10,
+            correlation: np.array = None,
+            step_days: int = 1,
+            days_in_year: int = 365
+    ) -> None:
+        self.economy = economy
+        # Annualized volatilities of the level, slope and curvature factors, and the decay of their loadings.
+        self.factor_vols = np.asarray(factor_vols)
+        self.factor_decay = factor_decay
+        self.share_price_vol = share_price_vol
+        self.share_price_drift = share_price_drift
+        self.exchange_rate_vol = exchange_rate_vol
+        self.step_days = step_days
+        self.dt = step_days / days_in_year
+        self.currencies = list(dict.fromkeys(x.currency for x in economy.yield_curves.values()))
+        self.drivers = self._drivers()
+        if correlation is None:
+            correlation = np.eye(len(self.drivers))
+        self.cholesky = np.linalg.cholesky(correlation)
+
+    def _drivers(self) -> List[str]:
+        factors = ["level", "slope", "curvature"]
+        return [f"{currency}/{factor}" for currency in self.currencies for factor in factors] + \
+            list(self.economy.share_prices) + list(self.economy.exchange_rates)
+
+    def factor_loadings(self, tenors: np.array) -> np.array:
+        # Nelson-Siegel loadings of the node yields on the level, slope and curvature factors, shape (tenors x 3).
+        x = np.maximum(tenors, 1e-8) / self.factor_decay
+        slope = (1.0 - np.exp(-x)) / x
+        return np.stack([np.ones_like(x), slope, slope - np.exp(-x)], axis=1)
+
+    def generate(self, n_paths: int, n_steps: int, seed: int = None) -> ScenarioBank:
+        # 1. Correlated standard normal increments for all drivers, shape (paths x steps x drivers).
+        rng = np.random.default_rng(seed)
+        shocks = rng.standard_normal((n_paths, n_steps, len(self.drivers))) @ self.cholesky.T
+        walks = np.concatenate([np.zeros((n_paths, 1, len(self.drivers))), np.cumsum(shocks, axis=1)], axis=1)
+        walks *= np.sqrt(self.dt)
+        n_factors = 3 * len(self.currencies)
+        factor_walks = walks[..., :n_factors].reshape(n_paths, n_steps + 1, len(self.currencies), 3)
+        # 2. Yield curves, all curves of a currency share its factors.
+        yields = {}
+        for curve_id, yield_curve in self.economy.yield_curves.items():
+            factors = factor_walks[:, :, self.currencies.index(yield_curve.currency)] * self.factor_vols
+            yields[curve_id] = yield_curve.yields + factors @ self.factor_loadings(yield_curve.tenors).T
+        # 3. Share prices and exchange rates as (martingale corrected) log-normal processes.
+        times = np.arange(n_steps + 1) * self.dt
+        share_prices = {}
+        for k, (ticker_symbol, share_price) in enumerate(self.economy.share_prices.items()):
+            log_returns = (self.share_price_drift - 0.5 * self.share_price_vol ** 2) * times + \
+                self.share_price_vol * walks[..., n_factors + k]
+            share_prices[ticker_symbol] = share_price.value * np.exp(log_returns)
+        exchange_rates = {}
+        offset = n_factors + len(self.economy.share_prices)
+        for k, (identifier, exchange_rate) in enumerate(self.economy.exchange_rates.items()):
+            log_returns = -0.5 * self.exchange_rate_vol ** 2 * times + self.exchange_rate_vol * walks[..., offset + k]
+            exchange_rates[identifier] = exchange_rate.value * np.exp(log_returns)
+        return ScenarioBank(self.economy, yields, share_prices, exchange_rates, self.step_days)
@@ -1,5 +1,7 @@
+from __future__ import annotations
+
 import numpy as np
-import matplotlib.pyplot as plt
+from copy import copy
 from datetime import datetime
 from scipy.interpolate import CubicSpline
 
@@ -32,9 +34,50 @@ class YieldCurve:
 
     def bump_idx(self, idx: int, bump_size: float = 0.0001) -> None:
         # Todo: Allow for linear interpolation between tenor points.
-        self.yields[idx] += bump_size
+        self.yields[..., idx] += bump_size
         self.spline = self._fit_spline()
 
+    def bumped_tenor(self, tenor: float, bump_size: float = 0.0001) -> YieldCurve:
+        idx = np.abs(self.tenors-tenor).argmin()
+        return self.bumped_idx(idx, bump_size)
+
+    def bumped_idx(self, idx: int, bump_size: float = 0.0001) -> YieldCurve:
+        # Same as bump_idx, but leaves this curve untouched and returns a bumped copy.
+        node_shifts = np.zeros(len(self.tenors))
+        node_shifts[idx] = bump_size
+        return self.shifted(node_shifts)
+
+    def shifted(self, node_shifts: np.array) -> YieldCurve:
+        # Copy of this curve with shifted node yields. No spline is fitted as the spline is linear in the yields.
+        yield_curve = copy(self)
+        yield_curve.yields = self.yields + node_shifts
+        if isinstance(self.spline, NodeShiftedSpline):
+            yield_curve.spline = NodeShiftedSpline(self.spline.spline, self.node_basis, self.spline.node_shifts + node_shifts)
+        else:
+            yield_curve.spline = NodeShiftedSpline(self.spline, self.node_basis, node_shifts)
+        return yield_curve
+
+    @property
+    def node_basis(self) -> CubicSpline:
+        # Spline through the unit vectors, i.e. column k is the derivative of the spline w.r.t. the yield at node k.
+        if getattr(self, "_node_basis", None) is None:
+            self._node_basis = CubicSpline(self.tenors, np.eye(len(self.tenors)))
+        return self._node_basis
+
+    def discount_factor_node_sensitivities(self, current_date: datetime, future_dates: np.array) -> np.array:
+        # Exact derivatives of the discount factors w.r.t. the node yields, shape (dates x nodes).
+        tenors = self.date_helper.tenors(current_date, future_dates)
+        discount_factors = np.exp(-tenors * self.spline(tenors))
+        return -(tenors * discount_factors)[..., None] * self.node_basis(tenors)
+
+    def forward_rate_node_sensitivities(self, current_date: datetime, accrual_start_dates: np.array,
+                                        accrual_end_dates: np.array) -> np.array:
+        # Exact derivatives of forward_rates w.r.t. the node yields, shape (periods x nodes).
+        t1 = self.date_helper.accrual_factors(current_date, accrual_start_dates)
+        t2 = self.date_helper.accrual_factors(current_date, accrual_end_dates)
+        b1, b2 = self.node_basis(t1), self.node_basis(t2)
+        return (b2 * t2[:, None] - b1 * t1[:, None]) / (t2 - t1)[:, None]
+
     def _fit_spline(self) -> CubicSpline:
         return CubicSpline(self.tenors, self.yields)
 
@@ -59,14 +102,25 @@ class YieldCurve:
         tenors = self.date_helper.tenors(current_date, payment_dates, start_date)
         yields = self.spline(tenors)
         t1, t2 = tenors[:-1], tenors[1:]
-        y1, y2 = yields[:-1], yields[1:]
+        y1, y2 = yields[..., :-1], yields[..., 1:]
         fwds = (y2 * t2 - y1 * t1) / (t2 - t1)
-        if len(fwds) < len(payment_dates):
+        if fwds.shape[-1] < len(payment_dates):
             # In this case we are unable to observe the previous fixing.
-            fwds = np.insert(fwds, 0, self.old_fixing)
+            fwds = np.insert(fwds, 0, self.old_fixing, axis=-1)
         return fwds
 
+    def forward_rates(self, current_date: datetime, accrual_start_dates: np.array,
+                      accrual_end_dates: np.array) -> np.array:
+        # Forward rates for arbitrary accrual periods using a single spline evaluation.
+        t1 = self.date_helper.accrual_factors(current_date, accrual_start_dates)
+        t2 = self.date_helper.accrual_factors(current_date, accrual_end_dates)
+        yields = self.spline(np.concatenate([t1, t2]))
+        y1, y2 = yields[..., :len(t1)], yields[..., len(t1):]
+        return (y2 * t2 - y1 * t1) / (t2 - t1)
+
     def plot(self):
+        # Matplotlib is imported on use, valuations do not need it.
+        import matplotlib.pyplot as plt
         xs = np.linspace(np.min(self.tenors), np.max(self.tenors), num=100)
         plt.title(self.identifier)
         plt.plot(self.tenors, self.yields, 'o', label='data')
@@ -75,3 +129,19 @@ class YieldCurve:
         plt.xlabel("Tenor")
         plt.legend()
         plt.show()
+
+
+class NodeShiftedSpline:
+    """
+    Cubic spline through shifted node yields, evaluated as the original spline
+    plus the node basis splines weighted by the shifts.
+    """
+
+    def __init__(self, spline: CubicSpline, node_basis: CubicSpline, node_shifts: np.array) -> None:
+        self.spline = spline
+        self.node_basis = node_basis
+        self.node_shifts = node_shifts
+
+    def __call__(self, x):
+        # Shifts may be one row per scenario, see YieldCurveSet.
+        return self.spline(x) + np.inner(self.node_shifts, self.node_basis(x))
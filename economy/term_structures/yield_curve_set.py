@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+from typing import List
+from scipy.interpolate import CubicSpline
+
+from economy.term_structures.yield_curve import YieldCurve
+from utils.dates import DateHelper
+
+
+class YieldCurveSet(YieldCurve):
+    """
+    Yield curves of many scenarios on the same tenors, with yields of shape (scenarios x tenors).
+    Discount factors and forward rates are evaluated for all scenarios at once and get a leading
+    scenario axis, such that instruments valued on a set return one present value per scenario.
+    """
+
+    def __init__(
+            self,
+            identifier: str,
+            currency: str,
+            tenors: np.array,
+            yields: np.array,
+            date_helper: DateHelper = DateHelper()
+    ) -> None:
+        super().__init__(identifier, currency, tenors, np.atleast_2d(yields), date_helper)
+
+    @classmethod
+    def from_shifts(cls, yield_curve: YieldCurve, yield_shifts: np.array) -> YieldCurveSet:
+        # One scenario per row of node yield shifts applied to the curve.
+        yield_curve_set = cls(yield_curve.identifier, yield_curve.currency, yield_curve.tenors,
+                              yield_curve.yields + np.atleast_2d(yield_shifts), yield_curve.date_helper)
+        yield_curve_set.old_fixing = yield_curve.old_fixing
+        return yield_curve_set
+
+    @classmethod
+    def from_curves(cls, yield_curves: List[YieldCurve]) -> YieldCurveSet:
+        yield_curve = yield_curves[0]
+        yields = np.stack([x.yields for x in yield_curves])
+        yield_curve_set = cls(yield_curve.identifier, yield_curve.currency, yield_curve.tenors, yields,
+                              yield_curve.date_helper)
+        yield_curve_set.old_fixing = yield_curve.old_fixing
+        return yield_curve_set
+
+    @property
+    def n_scenarios(self) -> int:
+        return self.yields.shape[0]
+
+    def scenario(self, idx: int) -> YieldCurve:
+        yield_curve = YieldCurve(self.identifier, self.currency, self.tenors, self.yields[idx].copy(), self.date_helper)
+        yield_curve.old_fixing = self.old_fixing
+        return yield_curve
+
+    def _fit_spline(self) -> CubicSpline:
+        # A single spline with a cubic per scenario, evaluating to shape (scenarios x points).
+        return CubicSpline(self.tenors, self.yields, axis=1)
+
+    def plot(self, max_scenarios: int = 50):
+        # All scenarios in one figure, matplotlib is imported on use like for single curves.
+        import matplotlib.pyplot as plt
+        xs = np.linspace(np.min(self.tenors), np.max(self.tenors), num=100)
+        n_scenarios = min(self.n_scenarios, max_scenarios)
+        plt.title(f"{self.identifier} ({n_scenarios} of {self.n_scenarios} scenarios)")
+        plt.plot(xs, self.spline(xs)[:n_scenarios].T, linewidth=0.75, alpha=0.5)
+        plt.plot(self.tenors, self.yields[:n_scenarios].T, 'o', markersize=2)
+        plt.ylabel("Yield (%)")
+        plt.xlabel("Tenor")
+        plt.show()
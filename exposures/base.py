@@ -1,16 +1,19 @@
+import numpy as np
 from abc import ABC, abstractmethod
 from enum import Enum
-from copy import deepcopy
+from typing import List
 
 from instruments.base import InstrumentLevel1, InstrumentLevel2
 from instruments.portfolio import Portfolio
 from economy.base import Economy
+from exposures.context import ValuationContext
 
 
 class ExposureType(Enum):
     AssetAllocationEquity = "AssetAllocationEquity"
     AssetAllocationDebt = "AssetAllocationDebt"
     ZeroDelta = "ZeroDelta"
+    BucketedZeroDelta = "BucketedZeroDelta"
 
 
 class Exposure(ABC):
@@ -20,19 +23,24 @@ class Exposure(ABC):
         self.exposure_type = exposure_type
 
     @abstractmethod
-    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy) -> float:
-        # Todo: Re-use portfolio calculations.
+    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None) -> float:
+        # Exposures evaluated on the same context share its valuations.
         pass
 
+    def labels(self) -> List[str]:
+        # One label per component of the exposure.
+        return [self.identifier]
+
 
 class AssetAllocationEquity(Exposure):
 
     def __init__(self, identifier: str) -> None:
         super().__init__(identifier=identifier, exposure_type=ExposureType.AssetAllocationEquity)
 
-    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy) -> float:
-        portfolio_equity = portfolio.filter_on_level_2([InstrumentLevel2.Equity])
-        return portfolio_equity.value(economy)
+    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None) -> float:
+        if context is None:
+            context = ValuationContext(portfolio, economy)
+        return context.filtered_value([InstrumentLevel2.Equity])
 
 
 class AssetAllocationDebt(Exposure):
@@ -40,9 +48,10 @@ class AssetAllocationDebt(Exposure):
     def __init__(self, identifier: str) -> None:
         super().__init__(identifier=identifier, exposure_type=ExposureType.AssetAllocationDebt)
 
-    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy) -> float:
-        portfolio_debt = portfolio.filter_on_level_2([InstrumentLevel2.Debt])
-        return portfolio_debt.value(economy)
+    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None) -> float:
+        if context is None:
+            context = ValuationContext(portfolio, economy)
+        return context.filtered_value([InstrumentLevel2.Debt])
 
 
 class ZeroDelta(Exposure):
@@ -53,12 +62,42 @@ class ZeroDelta(Exposure):
         self.tenor = tenor
         self.bump_size = bump_size
 
-    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy) -> float:
-        return self._compute_delta(portfolio, economy, self.tenor)
+    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None) -> float:
+        if context is None:
+            return self._compute_delta(portfolio, economy, self.tenor)
+        key = ("zero_delta", self.curve_identifier, self.tenor, self.bump_size)
+        return context.get(key, lambda: self._compute_delta(portfolio, economy, self.tenor))
 
     def _compute_delta(self, portfolio: Portfolio, economy: Economy, tenor: float) -> float:
-        economy_up = deepcopy(economy)
-        economy_down = deepcopy(economy)
-        economy_up.yield_curves[self.curve_identifier].bump_tenor(tenor, self.bump_size)
-        economy_down.yield_curves[self.curve_identifier].bump_tenor(tenor, bump_size=-self.bump_size)
-        return (portfolio.value(economy_up)-portfolio.value(economy_down))/(2.0*self.bump_size)
\ No newline at end of file
+        yield_curve = economy.yield_curves[self.curve_identifier]
+        economy_up = economy.overlay(yield_curves={
+            self.curve_identifier: yield_curve.bumped_tenor(tenor, self.bump_size)
+        })
+        economy_down = economy.overlay(yield_curves={
+            self.curve_identifier: yield_curve.bumped_tenor(tenor, bump_size=-self.bump_size)
+        })
+        return (portfolio.value(economy_up)-portfolio.value(economy_down))/(2.0*self.bump_size)
+
+
+class BucketedZeroDelta(Exposure):
+    """
+    Key rate ladder of zero deltas for the curve nodes closest to the given tenors.
+    All bumps are computed in one pass on the portfolio book instead of a full revaluation per bump.
+    """
+
+    def __init__(self, identifier: str, curve_identifier: str, tenors: List[float], bump_size: float = 0.0001) -> None:
+        super().__init__(identifier=identifier, exposure_type=ExposureType.BucketedZeroDelta)
+        self.curve_identifier = curve_identifier
+        self.tenors = tenors
+        self.bump_size = bump_size
+
+    def portfolio_exposure(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None) -> np.array:
+        if context is None:
+            context = ValuationContext(portfolio, economy)
+        deltas = context.node_deltas(self.curve_identifier, self.bump_size)
+        curve_tenors = economy.yield_curves[self.curve_identifier].tenors
+        node_idxs = [np.abs(curve_tenors - tenor).argmin() for tenor in self.tenors]
+        return deltas[node_idxs]
+
+    def labels(self) -> List[str]:
+        return [f"{self.identifier} {tenor:g}" for tenor in self.tenors]
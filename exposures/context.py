@@ -0,0 +1,52 @@
+import numpy as np
+from typing import Dict, List
+
+from instruments.base import InstrumentLevel2
+from instruments.portfolio import Portfolio
+from economy.base import Economy
+
+
+class ValuationContext:
+    """
+    Valuations of one portfolio in one economy shared by all exposures of a mandate.
+    Per-instrument values are computed once and filtered values are sums over the indexed positions.
+    """
+
+    def __init__(self, portfolio: Portfolio, economy: Economy) -> None:
+        self.portfolio = portfolio
+        self.economy = economy
+        self.revision = portfolio.revision
+        self.cache: Dict[tuple, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def is_valid_for(self, portfolio: Portfolio, economy: Economy) -> bool:
+        return portfolio is self.portfolio and economy is self.economy and portfolio.revision == self.revision
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def instrument_values(self) -> np.array:
+        return self.get(("instrument_values",), lambda: self.portfolio.instrument_values(self.economy))
+
+    def filtered_value(self, level_2s: List[InstrumentLevel2]) -> float:
+        key = ("filtered_value", tuple(level_2s))
+        positions = self.portfolio.filter_on_level_2(level_2s).local_positions
+        return self.get(key, lambda: float(np.sum(self.instrument_values()[positions])))
+
+    def node_deltas(self, curve_identifier: str, bump_size: float) -> np.array:
+        key = ("node_deltas", curve_identifier, bump_size)
+        return self.get(key, lambda: self.portfolio.book.node_deltas(self.economy, curve_identifier, bump_size))
+
+    def get(self, key: tuple, compute):
+        if key in self.cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.cache[key] = compute()
+        return self.cache[key]
+
+    def __repr__(self) -> str:
+        return f"ValuationContext(revision={self.revision}, hits={self.hits}, misses={self.misses})"
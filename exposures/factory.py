@@ -1,6 +1,6 @@
 from exposures.base import Exposure, ExposureType
 from exposures.base import AssetAllocationDebt, AssetAllocationEquity
-from exposures.base import ZeroDelta
+from exposures.base import ZeroDelta, BucketedZeroDelta
 
 
 class ExposureFactory:
@@ -12,6 +12,8 @@ class ExposureFactory:
             return self._create_asset_allocation_equity(**kwargs)
         elif exposure_type == ExposureType.ZeroDelta.value:
             return self._create_zero_delta(**kwargs)
+        elif exposure_type == ExposureType.BucketedZeroDelta.value:
+            return self._create_bucketed_zero_delta(**kwargs)
 
     @staticmethod
     def _create_asset_allocation_debt(identifier: str) -> AssetAllocationDebt:
@@ -24,3 +26,7 @@ class ExposureFactory:
     @staticmethod
     def _create_zero_delta(identifier: str, curve_identifier: str, tenor: float) -> ZeroDelta:
         return ZeroDelta(identifier=identifier, curve_identifier=curve_identifier, tenor=tenor)
+
+    @staticmethod
+    def _create_bucketed_zero_delta(identifier: str, curve_identifier: str, tenors: list) -> BucketedZeroDelta:
+        return BucketedZeroDelta(identifier=identifier, curve_identifier=curve_identifier, tenors=tenors)
@@ -0,0 +1,509 @@
+"""
+This module contains a columnar (struct-of-arrays) representation of a portfolio.
+Instruments are grouped by their level 3 type and their terms are stored in NumPy arrays,
+such that each group can be valued with a few array operations per curve.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import defaultdict
+from copy import copy
+from datetime import datetime
+from typing import Dict, List
+
+from economy.base import Economy
+from instruments.base import Instrument, InstrumentLevel3
+from instruments.derivatives.swaps import SwapType
+from utils.cash_flows import CashFlowLadder
+
+
+class BookSegment(ABC):
+    """
+    All instruments of a single level 3 type. Instruments are buffered on insertion and
+    appended to the column arrays the next time the segment is valued.
+    """
+
+    def __init__(self, instrument_level_3: InstrumentLevel3) -> None:
+        self.instrument_level_3 = instrument_level_3
+        self.instruments = []
+        self._pending = []
+
+    def add_instrument(self, instrument: Instrument) -> None:
+        self.instruments.append(instrument)
+        self._pending.append(instrument)
+
+    def values(self, economy: Economy) -> np.array:
+        self._flush()
+        return self._values(economy)
+
+    def update_notional(self, row: int, instrument: Instrument) -> None:
+        # The instrument replaces the one at the row and may only differ from it in notional.
+        self.instruments[row] = instrument
+        n_appended = len(self.instruments) - len(self._pending)
+        if row >= n_appended:
+            self._pending[row - n_appended] = instrument
+        else:
+            self._update_notional_columns(row, instrument)
+
+    def _flush(self) -> None:
+        if self._pending:
+            self._append_columns(self._pending)
+            self._pending = []
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def copy(self) -> BookSegment:
+        # Column arrays are never modified in place, hence only the containers need to be copied.
+        segment = copy(self)
+        for name, attribute in vars(self).items():
+            if isinstance(attribute, (list, dict)):
+                setattr(segment, name, attribute.copy())
+        return segment
+
+    def node_deltas(self, economy: Economy, curve_identifier: str, bump_size: float) -> np.array:
+        # Central differences of the segment value for a bump of each node of the curve.
+        yield_curve = economy.yield_curves[curve_identifier]
+        deltas = np.zeros(len(yield_curve.tenors))
+        for idx in range(len(yield_curve.tenors)):
+            economy_up = economy.overlay(yield_curves={curve_identifier: yield_curve.bumped_idx(idx, bump_size)})
+            economy_down = economy.overlay(yield_curves={curve_identifier: yield_curve.bumped_idx(idx, -bump_size)})
+            deltas[idx] = (np.sum(self.values(economy_up)) - np.sum(self.values(economy_down))) / (2.0 * bump_size)
+        return deltas
+
+    @abstractmethod
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        pass
+
+    @abstractmethod
+    def _values(self, economy: Economy) -> np.array:
+        pass
+
+    @abstractmethod
+    def _update_notional_columns(self, row: int, instrument: Instrument) -> None:
+        pass
+
+    @staticmethod
+    def _encode(identifier: str, identifiers: Dict[str, int]) -> int:
+        # Identifiers (curves, tickers) are stored as integer codes into a lookup table.
+        if identifier not in identifiers:
+            identifiers[identifier] = len(identifiers)
+        return identifiers[identifier]
+
+
+class InstrumentSegment(BookSegment):
+    """
+    Fallback for instrument types without a vectorized pricer.
+    """
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        pass
+
+    def _values(self, economy: Economy) -> np.array:
+        values = [instrument.value_from_economy(economy) for instrument in self.instruments]
+        return np.stack(np.broadcast_arrays(*values), axis=-1).astype(float)
+
+    def _update_notional_columns(self, row: int, instrument: Instrument) -> None:
+        pass
+
+
+class StockSegment(BookSegment):
+
+    def __init__(self, instrument_level_3: InstrumentLevel3 = InstrumentLevel3.Stock) -> None:
+        super().__init__(instrument_level_3)
+        self.ticker_symbols = {}
+        self.ticker_ids = np.zeros(0, dtype=np.int64)
+        self.notionals = np.zeros(0)
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        ticker_ids = [self._encode(x.share.ticker_symbol, self.ticker_symbols) for x in instruments]
+        self.ticker_ids = np.concatenate([self.ticker_ids, ticker_ids]).astype(np.int64)
+        self.notionals = np.concatenate([self.notionals, [x.notional for x in instruments]])
+
+    def _values(self, economy: Economy) -> np.array:
+        share_prices = np.broadcast_arrays(*[economy.share_prices[x].value for x in self.ticker_symbols])
+        return np.stack(share_prices, axis=-1)[..., self.ticker_ids] * self.notionals
+
+    def _update_notional_columns(self, row: int, instrument: Instrument) -> None:
+        # Columns may be shared with copies of the segment, hence they are copied before writing.
+        self.notionals = self.notionals.copy()
+        self.notionals[row] = instrument.notional
+
+    def node_deltas(self, economy: Economy, curve_identifier: str, bump_size: float) -> np.array:
+        return np.zeros(len(economy.yield_curves[curve_identifier].tenors))
+
+
+class CashFlowSegment(BookSegment):
+    """
+    Instruments whose value is the present value of a set of (fixed or floating) cash flows.
+    Each cash flow is a row in the flow arrays pointing to its instrument (owner), such that all cash flows
+    discounted on the same curve are valued with a single spline evaluation.
+    """
+
+    def __init__(self, instrument_level_3: InstrumentLevel3) -> None:
+        super().__init__(instrument_level_3)
+        self.curve_identifiers = {}
+        # Instrument columns.
+        self.notionals = np.zeros(0)
+        self.discount_curve_ids = np.zeros(0, dtype=np.int64)
+        self.maturities = np.zeros(0, dtype="datetime64[us]")
+        # Cash flow columns.
+        self.flow_owners = np.zeros(0, dtype=np.int64)
+        self.flow_discount_curve_ids = np.zeros(0, dtype=np.int64)
+        self.flow_forecast_curve_ids = np.zeros(0, dtype=np.int64)
+        self.flow_payment_dates = np.zeros(0, dtype="datetime64[us]")
+        self.flow_accrual_start_dates = np.zeros(0, dtype="datetime64[us]")
+        self.flow_year_fractions = np.zeros(0)
+        self.flow_fixed_amounts = np.zeros(0)
+        self.flow_floating_notionals = np.zeros(0)
+        self.flow_first_period = np.zeros(0, dtype=bool)
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        n_existing = len(self.notionals)
+        self.notionals = np.concatenate([self.notionals, [x.notional for x in instruments]])
+        self.discount_curve_ids = np.concatenate(
+            [self.discount_curve_ids, [self._encode(x.discount_curve_id, self.curve_identifiers) for x in instruments]]
+        ).astype(np.int64)
+        self.maturities = np.concatenate(
+            [self.maturities, np.array([x.maturity_date for x in instruments], dtype="datetime64[us]")]
+        )
+        flows = [self._instrument_flows(x) for x in instruments]
+        flows = [{**leg, "owner": n_existing + k} for k, legs in enumerate(flows) for leg in legs]
+        self.flow_owners = self._append(self.flow_owners, [np.full(len(x["payment_dates"]), x["owner"]) for x in flows])
+        self.flow_discount_curve_ids = self._append(
+            self.flow_discount_curve_ids,
+            [np.full(len(x["payment_dates"]), self._encode(x["discount_curve_id"], self.curve_identifiers))
+             for x in flows]
+        )
+        self.flow_forecast_curve_ids = self._append(
+            self.flow_forecast_curve_ids,
+            [np.full(len(x["payment_dates"]), -1 if x["forecast_curve_id"] is None else
+                     self._encode(x["forecast_curve_id"], self.curve_identifiers)) for x in flows]
+        )
+        self.flow_payment_dates = self._append(self.flow_payment_dates, [x["payment_dates"] for x in flows])
+        self.flow_accrual_start_dates = self._append(self.flow_accrual_start_dates, [x["accrual_start_dates"] for x in flows])
+        self.flow_year_fractions = self._append(self.flow_year_fractions, [x["year_fractions"] for x in flows])
+        self.flow_fixed_amounts = self._append(self.flow_fixed_amounts, [x["fixed_amounts"] for x in flows])
+        self.flow_floating_notionals = self._append(self.flow_floating_notionals, [x["floating_notionals"] for x in flows])
+        self.flow_first_period = self._append(
+            self.flow_first_period, [np.arange(len(x["payment_dates"])) == 0 for x in flows]
+        )
+
+    @abstractmethod
+    def _instrument_flows(self, instrument: Instrument) -> List[dict]:
+        pass
+
+    def _update_notional_columns(self, row: int, instrument: Instrument) -> None:
+        # Columns may be shared with copies of the segment, hence they are copied before writing.
+        flows = self._instrument_flows(instrument)
+        flow_rows = np.flatnonzero(self.flow_owners == row)
+        fixed_amounts = np.concatenate([x["fixed_amounts"] for x in flows])
+        if len(fixed_amounts) != len(flow_rows):
+            raise ValueError(f"Cash flow schedule of {instrument.instrument_level_3} can not change!")
+        self.notionals = self.notionals.copy()
+        self.notionals[row] = instrument.notional
+        self.flow_fixed_amounts = self.flow_fixed_amounts.copy()
+        self.flow_fixed_amounts[flow_rows] = fixed_amounts
+        self.flow_floating_notionals = self.flow_floating_notionals.copy()
+        self.flow_floating_notionals[flow_rows] = np.concatenate([x["floating_notionals"] for x in flows])
+
+    def projected_cash_flows(self, economy: Economy) -> tuple:
+        # Cash flows after the current date as (owners, discount curve ids, payment dates, amounts).
+        self._flush()
+        current_date = np.datetime64(economy.current_date, "us")
+        live = self.flow_payment_dates > current_date
+        cash_flows = self.flow_fixed_amounts[live] + self._floating_amounts(economy, current_date, live)
+        return self.flow_owners[live], self.flow_discount_curve_ids[live], self.flow_payment_dates[live], cash_flows
+
+    def _values(self, economy: Economy) -> np.array:
+        owners, discount_curve_ids, payment_dates, cash_flows = self.projected_cash_flows(economy)
+        discount_factors = self._discount_factors(economy, discount_curve_ids, payment_dates)
+        present_values = cash_flows * discount_factors
+        if present_values.ndim == 1:
+            return np.bincount(owners, weights=present_values, minlength=len(self.notionals))
+        # Scenario economy, sum the present values per owner for each scenario.
+        values = np.zeros((len(self.notionals),) + present_values.shape[:-1])
+        np.add.at(values, owners, np.moveaxis(present_values, -1, 0))
+        return np.moveaxis(values, 0, -1)
+
+    def _discount_factors(self, economy: Economy, curve_ids: np.array, payment_dates: np.array) -> np.array:
+        discount_factors = np.zeros(economy.scenario_shape + (len(payment_dates),))
+        for curve_identifier, curve_id in self.curve_identifiers.items():
+            mask = curve_ids == curve_id
+            if np.any(mask):
+                discount_curve = economy.yield_curves[curve_identifier]
+                discount_factors[..., mask] = discount_curve.discount_factor_strip(
+                    economy.current_date, payment_dates[mask]
+                )
+        return discount_factors
+
+    def _floating_amounts(self, economy: Economy, current_date: np.datetime64, live: np.array) -> np.array:
+        curve_ids = self.flow_forecast_curve_ids[live]
+        floating_amounts = np.zeros(len(curve_ids))
+        if np.all(curve_ids < 0):
+            return floating_amounts
+        accrual_start_dates = self.flow_accrual_start_dates[live]
+        payment_dates = self.flow_payment_dates[live]
+        fixed = self._fixed_periods(current_date, live)
+        forward_rates = np.zeros(economy.scenario_shape + (len(curve_ids),))
+        for curve_identifier, curve_id in self.curve_identifiers.items():
+            mask = curve_ids == curve_id
+            if np.any(mask):
+                forecast_curve = economy.yield_curves[curve_identifier]
+                forward_rates[..., mask & fixed] = forecast_curve.old_fixing
+                mask &= ~fixed
+                forward_rates[..., mask] = forecast_curve.forward_rates(
+                    economy.current_date, accrual_start_dates[mask], payment_dates[mask]
+                )
+        return self.flow_floating_notionals[live] * self.flow_year_fractions[live] * forward_rates
+
+    def _fixed_periods(self, current_date: np.datetime64, live: np.array) -> np.array:
+        # The current period has already been fixed, unless it starts today and no previous period exists.
+        accrual_start_dates = self.flow_accrual_start_dates[live]
+        return (accrual_start_dates < current_date) | \
+               ((accrual_start_dates == current_date) & ~self.flow_first_period[live])
+
+    def node_deltas(self, economy: Economy, curve_identifier: str, bump_size: float) -> np.array:
+        # All up and down node bumps are evaluated as a batch of scenarios (columns) on the affected cash flows.
+        self._flush()
+        yield_curve = economy.yield_curves[curve_identifier]
+        n_nodes = len(yield_curve.tenors)
+        if curve_identifier not in self.curve_identifiers:
+            return np.zeros(n_nodes)
+        curve_id = self.curve_identifiers[curve_identifier]
+        current_date = np.datetime64(economy.current_date, "us")
+        live = self.flow_payment_dates > current_date
+        rows = live & ((self.flow_discount_curve_ids == curve_id) | (self.flow_forecast_curve_ids == curve_id))
+        payment_dates = self.flow_payment_dates[rows]
+        cash_flows = self.flow_fixed_amounts[rows] + self._floating_amounts(economy, current_date, rows)
+        discount_factors = self._discount_factors(economy, self.flow_discount_curve_ids[rows], payment_dates)
+        # 1. Sensitivities of the cash flows through the forward rates, which are linear in the node yields.
+        cash_flow_jacobian = np.zeros((len(payment_dates), n_nodes))
+        forecast = (self.flow_forecast_curve_ids[rows] == curve_id) & ~self._fixed_periods(current_date, rows)
+        if np.any(forecast):
+            forward_rate_jacobian = yield_curve.forward_rate_node_sensitivities(
+                economy.current_date, self.flow_accrual_start_dates[rows][forecast], payment_dates[forecast]
+            )
+            floating_notionals = self.flow_floating_notionals[rows][forecast] * self.flow_year_fractions[rows][forecast]
+            cash_flow_jacobian[forecast] = floating_notionals[:, None] * forward_rate_jacobian
+        # 2. Discount factors per scenario, bumping the yields interpolated at the payment dates.
+        discounted = self.flow_discount_curve_ids[rows] == curve_id
+        tenors = yield_curve.date_helper.tenors(economy.current_date, payment_dates[discounted])
+        yields, node_basis = yield_curve.spline(tenors), yield_curve.node_basis(tenors)
+        present_values = []
+        for bump in [bump_size, -bump_size]:
+            scenario_discount_factors = np.repeat(discount_factors[:, None], n_nodes, axis=1)
+            scenario_discount_factors[discounted] = np.exp(-tenors[:, None] * (yields[:, None] + bump * node_basis))
+            scenario_cash_flows = cash_flows[:, None] + bump * cash_flow_jacobian
+            present_values.append(np.sum(scenario_cash_flows * scenario_discount_factors, axis=0))
+        return (present_values[0] - present_values[1]) / (2.0 * bump_size)
+
+    @staticmethod
+    def _append(column: np.array, chunks: List[np.array]) -> np.array:
+        return np.concatenate([column] + chunks).astype(column.dtype)
+
+    @staticmethod
+    def _leg_flows(date_schedule, start_date: datetime, discount_curve_id: str, forecast_curve_id: str = None,
+                   fixed_amounts: np.array = None, floating_notional: float = 0.0) -> dict:
+        payment_dates = date_schedule.payment_dates
+        n_flows = len(payment_dates)
+        return {
+            "discount_curve_id": discount_curve_id,
+            "forecast_curve_id": forecast_curve_id,
+            "payment_dates": payment_dates,
+            "accrual_start_dates": np.concatenate([[np.datetime64(start_date, "us")], payment_dates[:-1]]),
+            "year_fractions": date_schedule.year_fractions,
+            "fixed_amounts": np.zeros(n_flows) if fixed_amounts is None else fixed_amounts,
+            "floating_notionals": np.full(n_flows, floating_notional)
+        }
+
+
+class ZeroCouponBondSegment(CashFlowSegment):
+
+    def __init__(self, instrument_level_3: InstrumentLevel3 = InstrumentLevel3.ZeroCouponBond) -> None:
+        super().__init__(instrument_level_3)
+
+    def _instrument_flows(self, instrument: Instrument) -> List[dict]:
+        fixed_amounts = np.array([instrument.notional], dtype=float)
+        return [self._leg_flows(instrument.date_schedule, instrument.start_date, instrument.discount_curve_id,
+                                fixed_amounts=fixed_amounts)]
+
+
+class FixedRateBondSegment(CashFlowSegment):
+
+    def __init__(self, instrument_level_3: InstrumentLevel3 = InstrumentLevel3.FixedRateBond) -> None:
+        super().__init__(instrument_level_3)
+        self.fixed_rates = np.zeros(0)
+        self.redeems_notional = instrument_level_3 != InstrumentLevel3.FixedLeg
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        self.fixed_rates = np.concatenate([self.fixed_rates, [x.fixed_rate.value for x in instruments]])
+        super()._append_columns(instruments)
+
+    def _instrument_flows(self, instrument: Instrument) -> List[dict]:
+        schedule = instrument.date_schedule
+        fixed_amounts = instrument.notional * schedule.year_fractions * instrument.fixed_rate.value
+        if self.redeems_notional and len(fixed_amounts) > 0:
+            fixed_amounts[-1] += instrument.notional
+        return [self._leg_flows(schedule, instrument.start_date, instrument.discount_curve_id,
+                                fixed_amounts=fixed_amounts)]
+
+
+class FloatingRateBondSegment(CashFlowSegment):
+
+    def __init__(self, instrument_level_3: InstrumentLevel3 = InstrumentLevel3.FloatingRateBond) -> None:
+        super().__init__(instrument_level_3)
+        self.forecast_curve_ids = np.zeros(0, dtype=np.int64)
+        self.redeems_notional = instrument_level_3 != InstrumentLevel3.FloatingLeg
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        self.forecast_curve_ids = np.concatenate(
+            [self.forecast_curve_ids, [self._encode(x.forecast_curve_id, self.curve_identifiers) for x in instruments]]
+        ).astype(np.int64)
+        super()._append_columns(instruments)
+
+    def _instrument_flows(self, instrument: Instrument) -> List[dict]:
+        schedule = instrument.date_schedule
+        fixed_amounts = np.zeros(len(schedule.payment_dates))
+        if self.redeems_notional and len(fixed_amounts) > 0:
+            fixed_amounts[-1] += instrument.notional
+        return [self._leg_flows(schedule, instrument.start_date, instrument.discount_curve_id,
+                                instrument.forecast_curve_id, fixed_amounts=fixed_amounts,
+                                floating_notional=instrument.notional)]
+
+
+class InterestRateSwapSegment(CashFlowSegment):
+
+    def __init__(self, instrument_level_3: InstrumentLevel3 = InstrumentLevel3.InterestRateSwap) -> None:
+        super().__init__(instrument_level_3)
+        self.forecast_curve_ids = np.zeros(0, dtype=np.int64)
+        self.swap_rates = np.zeros(0)
+        self.swap_signs = np.zeros(0)
+
+    def _append_columns(self, instruments: List[Instrument]) -> None:
+        self.forecast_curve_ids = np.concatenate(
+            [self.forecast_curve_ids, [self._encode(x.forecast_curve_id, self.curve_identifiers) for x in instruments]]
+        ).astype(np.int64)
+        self.swap_rates = np.concatenate([self.swap_rates, [x.fixed_leg.fixed_rate.value for x in instruments]])
+        self.swap_signs = np.concatenate([self.swap_signs, [self._swap_sign(x) for x in instruments]])
+        super()._append_columns(instruments)
+
+    def _instrument_flows(self, instrument: Instrument) -> List[dict]:
+        # A receiver swap receives the fixed leg and pays the floating leg, a payer swap the other way around.
+        sign = self._swap_sign(instrument)
+        fixed_leg, floating_leg = instrument.fixed_leg, instrument.floating_leg
+        fixed_amounts = sign * (fixed_leg.notional * fixed_leg.date_schedule.year_fractions * fixed_leg.fixed_rate.value)
+        return [
+            self._leg_flows(fixed_leg.date_schedule, fixed_leg.start_date, fixed_leg.discount_curve_id,
+                            fixed_amounts=fixed_amounts),
+            self._leg_flows(floating_leg.date_schedule, floating_leg.start_date, floating_leg.discount_curve_id,
+                            floating_leg.forecast_curve_id, floating_notional=-sign * floating_leg.notional)
+        ]
+
+    @staticmethod
+    def _swap_sign(instrument: Instrument) -> float:
+        if instrument.swap_type == SwapType.Receiver.value:
+            return 1.0
+        elif instrument.swap_type == SwapType.Payer.value:
+            return -1.0
+        else:
+            raise ValueError(f"Swap type {instrument.swap_type} not recognized!")
+
+
+class PortfolioBook:
+    """
+    Columnar view of a list of instruments with vectorized valuation per level 3 type.
+    The terms of an instrument are captured when it is added to the book.
+    """
+
+    segment_types = {
+        InstrumentLevel3.Stock: StockSegment,
+        InstrumentLevel3.ZeroCouponBond: ZeroCouponBondSegment,
+        InstrumentLevel3.FixedRateBond: FixedRateBondSegment,
+        InstrumentLevel3.FixedLeg: FixedRateBondSegment,
+        InstrumentLevel3.FloatingRateBond: FloatingRateBondSegment,
+        InstrumentLevel3.FloatingLeg: FloatingRateBondSegment,
+        InstrumentLevel3.InterestRateSwap: InterestRateSwapSegment
+    }
+
+    def __init__(self, instruments: List[Instrument] = None) -> None:
+        self.segments: Dict[InstrumentLevel3, BookSegment] = {}
+        self.segment_positions: Dict[InstrumentLevel3, List[int]] = {}
+        self.n_instruments = 0
+        for instrument in instruments or []:
+            self.add_instrument(instrument)
+
+    def copy(self) -> PortfolioBook:
+        book = PortfolioBook()
+        book.segments = {level_3: segment.copy() for level_3, segment in self.segments.items()}
+        book.segment_positions = {level_3: list(positions) for level_3, positions in self.segment_positions.items()}
+        book.n_instruments = self.n_instruments
+        return book
+
+    def add_instrument(self, instrument: Instrument) -> None:
+        instrument_level_3 = instrument.instrument_level_3
+        if instrument_level_3 not in self.segments:
+            segment_type = self.segment_types.get(instrument_level_3, InstrumentSegment)
+            self.segments[instrument_level_3] = segment_type(instrument_level_3)
+            self.segment_positions[instrument_level_3] = []
+        self.segments[instrument_level_3].add_instrument(instrument)
+        self.segment_positions[instrument_level_3].append(self.n_instruments)
+        self.n_instruments += 1
+
+    def flush(self) -> None:
+        # Appends the buffered instruments of all segments to their columns, which happens on valuation otherwise.
+        for segment in self.segments.values():
+            segment._flush()
+
+    def update_notional(self, position: int, instrument: Instrument) -> None:
+        positions = self.segment_positions[instrument.instrument_level_3]
+        self.segments[instrument.instrument_level_3].update_notional(bisect_left(positions, position), instrument)
+
+    def instrument_values(self, economy: Economy) -> np.array:
+        # Values get the leading scenario axes of the economy, if any.
+        values = np.zeros(economy.scenario_shape + (self.n_instruments,))
+        for instrument_level_3, segment in self.segments.items():
+            values[..., self.segment_positions[instrument_level_3]] = segment.values(economy)
+        return values
+
+    def segment_values(self, economy: Economy) -> Dict[InstrumentLevel3, float]:
+        return {level_3: float(np.sum(segment.values(economy))) for level_3, segment in self.segments.items()}
+
+    def cash_flow_ladder(self, economy: Economy) -> CashFlowLadder:
+        # Merges the projected cash flows of all segments per discount curve before discounting.
+        payment_dates, cash_flows = defaultdict(list), defaultdict(list)
+        for segment in self.segments.values():
+            if isinstance(segment, CashFlowSegment):
+                _, curve_ids, segment_payment_dates, segment_cash_flows = segment.projected_cash_flows(economy)
+                for curve_identifier, curve_id in segment.curve_identifiers.items():
+                    mask = curve_ids == curve_id
+                    if np.any(mask):
+                        payment_dates[curve_identifier].append(segment_payment_dates[mask])
+                        cash_flows[curve_identifier].append(segment_cash_flows[mask])
+        ladder = CashFlowLadder(economy.current_date)
+        for curve_identifier in payment_dates:
+            ladder.add_cash_flows(economy.yield_curves[curve_identifier],
+                                  np.concatenate(payment_dates[curve_identifier]),
+                                  np.concatenate(cash_flows[curve_identifier]))
+        return ladder
+
+    def node_deltas(self, economy: Economy, curve_identifier: str, bump_size: float = 0.0001) -> np.array:
+        # Key rate ladder: sensitivity of the book value to each node yield of the curve.
+        yield_curve = economy.yield_curves[curve_identifier]
+        deltas = np.zeros(len(yield_curve.tenors))
+        for segment in self.segments.values():
+            deltas += segment.node_deltas(economy, curve_identifier, bump_size)
+        return deltas
+
+    def value(self, economy: Economy) -> float:
+        if economy.scenario_shape:
+            # The cash flow ladder aggregates the cash flows of a single economy.
+            return np.sum(self.instrument_values(economy), axis=-1)
+        value = self.cash_flow_ladder(economy).present_value()
+        for segment in self.segments.values():
+            if not isinstance(segment, CashFlowSegment):
+                value += np.sum(segment.values(economy))
+        return float(value)
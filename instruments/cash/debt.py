@@ -135,7 +135,7 @@ class FloatingRateLoan(Loan):
         schedule = self._clip_payment_dates(current_date)
         forward_rates = forecast_curve.forward_rate_strip(current_date, self.start_date, schedule.payment_dates)
         cash_flows = self.notional * schedule.year_fractions * forward_rates
-        cash_flows[-1] += self.notional
+        cash_flows[..., -1] += self.notional
         return CashFlowSchedule(schedule.payment_dates, cash_flows)
 
 
@@ -214,7 +214,7 @@ class FixedRateBond(FixedRateLoan):
             if next_payment_idx == 0:
                 accrual_start_date = self.date_schedule.start_date
             else:
-                accrual_start_date = self.date_schedule.payment_dates[next_payment_idx-1]
+                accrual_start_date = self.date_schedule.payment_dates[next_payment_idx-1].item()
             accrual_period_current = self.schedule_generator.date_helper.accrual_factor(accrual_start_date, current_date)
             accrued_interest = self.notional * self.fixed_rate.value * accrual_period_current
         return accrued_interest
@@ -1,28 +1,261 @@
 from __future__ import annotations
-from typing import List
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from copy import copy
+from typing import Dict, List
+
+import numpy as np
 
 from economy.base import Economy
-from instruments.base import Instrument, InstrumentLevel1, InstrumentLevel2
+from instruments.base import Instrument, InstrumentLevel1, InstrumentLevel2, InstrumentLevel3
+from instruments.book import PortfolioBook
+from utils.cash_flows import CashFlowLadder
 
 
-class Portfolio:
+class PortfolioFilters(ABC):
+    """
+    Filters on the portfolio index returning views, which follow instruments added later.
+    Filtering a view combines the new filter with the filters of the view.
+    """
 
-    def __init__(self, instruments: List[Instrument] = None) -> None:
+    def filter_on_level_1(self, level_1s: List[InstrumentLevel1]) -> PortfolioView:
+        return self.view("level_1", level_1s)
+
+    def filter_on_level_2(self, level_2s: List[InstrumentLevel2]) -> PortfolioView:
+        return self.view("level_2", level_2s)
+
+    def filter_on_level_3(self, level_3s: List[InstrumentLevel3]) -> PortfolioView:
+        return self.view("level_3", level_3s)
+
+    def filter_on_currency(self, currencies: List[str]) -> PortfolioView:
+        return self.view("currency", currencies)
+
+    def filter_on_curve(self, curve_ids: List[str]) -> PortfolioView:
+        # Instruments that discount or forecast on any of the curves.
+        return self.view("curve", curve_ids)
+
+    def filter_on_ticker(self, ticker_symbols: List[str]) -> PortfolioView:
+        return self.view("ticker", ticker_symbols)
+
+    @abstractmethod
+    def view(self, field: str, keys: list) -> PortfolioView:
+        pass
+
+
+class Portfolio(PortfolioFilters):
+
+    def __init__(self, instruments: List[Instrument] = None, book: PortfolioBook = None,
+                 index: PortfolioIndex = None, netting: bool = False) -> None:
+        # With netting, fungible instruments are merged into a single position with the summed notional.
+        self.netting = netting
+        self.net_positions: Dict[tuple, int] = {}
+        self.n_merges = 0
+        # Counts all updates of the portfolio, including merges which leave the number of instruments unchanged.
+        self.revision = 0
         if instruments is None:
             self.instruments = []
+        elif netting and book is None:
+            self.instruments = self._net(instruments)
         else:
             self.instruments = instruments
+        if book is None:
+            self.book = PortfolioBook(self.instruments)
+        else:
+            self.book = book
+        if index is None:
+            self.index = PortfolioIndex(self.instruments)
+        else:
+            self.index = index
+
+    def copy(self) -> Portfolio:
+        # Shares the instruments, which are never modified (merges replace them), with this portfolio.
+        portfolio = Portfolio(list(self.instruments), self.book.copy(), self.index.copy(), self.netting)
+        portfolio.net_positions = dict(self.net_positions)
+        portfolio.n_merges = self.n_merges
+        portfolio.revision = self.revision
+        return portfolio
 
     def add_instrument(self, instrument: Instrument) -> None:
+        self.revision += 1
+        key = self.netting_key(instrument) if self.netting else None
+        if key in self.net_positions:
+            position = self.net_positions[key]
+            self.instruments[position] = self._merge(self.instruments[position], instrument)
+            self.book.update_notional(position, self.instruments[position])
+            self.n_merges += 1
+            return
+        if key is not None:
+            self.net_positions[key] = len(self.instruments)
         self.instruments.append(instrument)
+        self.book.add_instrument(instrument)
+        self.index.add_instrument(instrument)
+
+    def compact(self) -> Portfolio:
+        # Netted portfolio with the same value and exposures as this portfolio.
+        return Portfolio(list(self.instruments), netting=True)
+
+    @staticmethod
+    def netting_key(instrument: Instrument) -> tuple:
+        # Instruments with the same key only differ in their notional, in which they are linear.
+        if instrument.instrument_level_3 == InstrumentLevel3.Stock:
+            return instrument.instrument_level_3, instrument.quote_currency, instrument.share.ticker_symbol
+        elif instrument.instrument_level_3 == InstrumentLevel3.ZeroCouponBond:
+            return instrument.instrument_level_3, instrument.quote_currency, instrument.discount_curve_id, \
+                instrument.maturity_date
+        return None
+
+    def _net(self, instruments: List[Instrument]) -> List[Instrument]:
+        netted = []
+        for instrument in instruments:
+            key = self.netting_key(instrument)
+            if key in self.net_positions:
+                position = self.net_positions[key]
+                netted[position] = self._merge(netted[position], instrument)
+                self.n_merges += 1
+                continue
+            if key is not None:
+                self.net_positions[key] = len(netted)
+            netted.append(instrument)
+        return netted
+
+    @staticmethod
+    def _merge(position: Instrument, instrument: Instrument) -> Instrument:
+        # A new instrument, as the merged ones may be shared with copies of the portfolio.
+        merged = copy(position)
+        merged.notional = position.notional + instrument.notional
+        return merged
+
+    def value(self, economy: Economy) -> float:
+        return self.book.value(economy)
+
+    def instrument_values(self, economy: Economy) -> np.array:
+        return self.book.instrument_values(economy)
+
+    def cash_flow_ladder(self, economy: Economy) -> CashFlowLadder:
+        return self.book.cash_flow_ladder(economy)
+
+    def view(self, field: str, keys: list) -> PortfolioView:
+        return PortfolioView(self, self.index.lookup(field, keys))
+
+
+class PortfolioIndex:
+    """
+    Positions of the instruments of a portfolio per level, quote currency, curve and ticker symbol.
+    The position lists only grow and are shared with the views handed out.
+    """
+
+    fields = ("level_1", "level_2", "level_3", "currency", "curve", "ticker")
+    curve_attributes = ("discount_curve_id", "forecast_curve_id", "discount_curve_quote_id", "discount_curve_base_id")
+
+    def __init__(self, instruments: List[Instrument] = None) -> None:
+        self.positions: Dict[str, Dict[object, List[int]]] = {field: defaultdict(list) for field in self.fields}
+        self.n_instruments = 0
+        for instrument in instruments or []:
+            self.add_instrument(instrument)
+
+    def add_instrument(self, instrument: Instrument) -> None:
+        for field, keys in self._keys(instrument).items():
+            for key in keys:
+                self.positions[field][key].append(self.n_instruments)
+        self.n_instruments += 1
+
+    def lookup(self, field: str, keys: list) -> List[List[int]]:
+        # Unknown keys get an empty position list, so that views also see instruments added later.
+        if field not in self.positions:
+            raise ValueError(f"Portfolio index {field} not recognized!")
+        return [self.positions[field][key] for key in dict.fromkeys(keys)]
+
+    def copy(self) -> PortfolioIndex:
+        index = PortfolioIndex()
+        for field, positions in self.positions.items():
+            index.positions[field].update({key: list(key_positions) for key, key_positions in positions.items()})
+        index.n_instruments = self.n_instruments
+        return index
+
+    def _keys(self, instrument: Instrument) -> Dict[str, list]:
+        curve_ids = [getattr(instrument, attribute, None) for attribute in self.curve_attributes]
+        ticker_symbol = getattr(instrument, "ticker_symbol", getattr(getattr(instrument, "share", None), "ticker_symbol", None))
+        return {
+            "level_1": [instrument.instrument_level_1],
+            "level_2": [instrument.instrument_level_2],
+            "level_3": [instrument.instrument_level_3],
+            "currency": [instrument.quote_currency],
+            "curve": list(dict.fromkeys(curve_id for curve_id in curve_ids if curve_id is not None)),
+            "ticker": [ticker_symbol] if ticker_symbol is not None else []
+        }
+
+
+class PortfolioView(PortfolioFilters):
+    """
+    Read-only view on the instruments of a portfolio at the positions of one or more index entries.
+    The view follows instruments added to the portfolio later and builds its book only when valued.
+    """
+
+    def __init__(self, portfolio: Portfolio, position_lists: List[List[int]], parent: PortfolioView = None) -> None:
+        self.portfolio = portfolio
+        self.position_lists = position_lists
+        # A view filtered from another view only holds positions that are also in the other view.
+        self.parent = parent
+        self._positions = []
+        self._n_candidates = None
+        self._book = None
+        self._n_merges = portfolio.n_merges
+
+    @property
+    def revision(self) -> int:
+        return self.portfolio.revision
+
+    @property
+    def positions(self) -> List[int]:
+        if len(self.position_lists) == 1 and self.parent is None:
+            return self.position_lists[0]
+        # Position lists only grow, so the positions only change with the number of candidates.
+        n_candidates = (sum(len(positions) for positions in self.position_lists),
+                        len(self.parent) if self.parent is not None else 0)
+        if self._n_candidates != n_candidates:
+            positions = sorted(set(position for positions in self.position_lists for position in positions))
+            if self.parent is not None:
+                parent_positions = set(self.parent.positions)
+                positions = [position for position in positions if position in parent_positions]
+            self._positions, self._n_candidates = positions, n_candidates
+        return self._positions
+
+    @property
+    def local_positions(self) -> np.array:
+        # Positions within the filtered portfolio or view, whose positions are sorted.
+        if self.parent is None:
+            return np.asarray(self.positions, dtype=int)
+        return np.searchsorted(self.parent.positions, self.positions)
+
+    @property
+    def instruments(self) -> List[Instrument]:
+        return [self.portfolio.instruments[position] for position in self.positions]
+
+    @property
+    def book(self) -> PortfolioBook:
+        # New instruments always take the last positions, so the book is only extended with them,
+        # unless positions have been merged into.
+        if self._book is None or self._n_merges != self.portfolio.n_merges:
+            self._book = PortfolioBook()
+            self._n_merges = self.portfolio.n_merges
+        for position in self.positions[self._book.n_instruments:]:
+            self._book.add_instrument(self.portfolio.instruments[position])
+        return self._book
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def copy(self) -> Portfolio:
+        return Portfolio(self.instruments)
+
+    def view(self, field: str, keys: list) -> PortfolioView:
+        return PortfolioView(self.portfolio, self.portfolio.index.lookup(field, keys), parent=self)
 
     def value(self, economy: Economy) -> float:
-        return sum([instrument.value_from_economy(economy) for instrument in self.instruments])
+        return self.book.value(economy)
 
-    def filter_on_level_1(self, level_1s: List[InstrumentLevel1]) -> Portfolio:
-        instruments = [instrument for instrument in self.instruments if instrument.instrument_level_1 in level_1s]
-        return Portfolio(instruments)
+    def instrument_values(self, economy: Economy) -> np.array:
+        return self.book.instrument_values(economy)
 
-    def filter_on_level_2(self, level_2s: List[InstrumentLevel2]) -> Portfolio:
-        instruments = [instrument for instrument in self.instruments if instrument.instrument_level_2 in level_2s]
-        return Portfolio(instruments)
\ No newline at end of file
+    def cash_flow_ladder(self, economy: Economy) -> CashFlowLadder:
+        return self.book.cash_flow_ladder(economy)
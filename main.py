@@ -5,41 +5,97 @@ will be flexible and can include stochastic scenarios or historical market data.
 """
 
 import os
+import argparse
 from datetime import datetime
 
 from readers.economy_reader import EconomyReader
 from readers.portfolio_reader import PortfolioReader
 from readers.mandate_reader import MandateReader
-from trading.environment import TradingEnvironment
-from trading.trader import Trader
-from trading.trainer import PolicyTrainer
+from readers.input_cache import InputCache
 
 CURRENT_DATE = datetime.now()
 ROOT_DIR = os.path.dirname(__file__)
+CACHE_DIR = os.path.join(ROOT_DIR, 'io', 'cache')
 
 
-def load_economy():
+def load_economy(input_cache: InputCache = None):
     economy_path = os.path.join(ROOT_DIR, 'io', 'input', 'economy')
-    return EconomyReader().read_economy(CURRENT_DATE, economy_path)
+    return EconomyReader(input_cache).read_economy(CURRENT_DATE, economy_path)
 
 
-def load_portfolio():
+def load_portfolio(input_cache: InputCache = None):
     portfolio_path = os.path.join(ROOT_DIR, 'io', 'input', 'portfolio')
-    return PortfolioReader().read_portfolio(portfolio_path)
+    return PortfolioReader(input_cache).read_portfolio(portfolio_path)
 
 
-def load_mandate():
+def load_mandate(input_cache: InputCache = None):
     mandate_path = os.path.join(ROOT_DIR, 'io', 'input', 'mandate')
-    return MandateReader().read_mandate(mandate_path)
+    return MandateReader(input_cache).read_mandate(mandate_path)
 
 
-def get_environment():
+def get_environment(input_cache: InputCache = None):
+    # Training imports (gym, torch) are deferred, such that valuations only load NumPy and SciPy.
     from instruments.portfolio import Portfolio
-    portfolio, mandate, economy = Portfolio(), load_mandate(), load_economy()
+    from trading.environment import TradingEnvironment
+    # Generated trades are netted into one position per instrument generator and maturity.
+    portfolio, mandate, economy = Portfolio(netting=True), load_mandate(input_cache), load_economy(input_cache)
     return TradingEnvironment(mandate=mandate, economy=economy, portfolio=portfolio)
 
 
-if __name__ == "__main__":
-    env = get_environment()
-    trade_policy = PolicyTrainer(env).learn_policy()
+def train(input_cache: InputCache = None) -> None:
+    from trading.trader import Trader
+    from trading.trainer import PolicyTrainer
+    env = get_environment(input_cache)
+    # Every rollout worker builds its own environment from the (cached) inputs.
+    trade_policy = PolicyTrainer(env, env_fn=lambda: get_environment(input_cache)).learn_policy()
     Trader(env, trade_policy).evaluate_policy(render=True)
+
+
+def value(input_cache: InputCache = None) -> None:
+    # Prints the value of the input portfolio and its mandate exposures against their targets.
+    economy, portfolio, mandate = load_economy(input_cache), load_portfolio(input_cache), load_mandate(input_cache)
+    print(f"* Portfolio value: {portfolio.value(economy):.2f}")
+    exposures = mandate.portfolio_exposures(portfolio, economy)
+    for label, exposure, target in zip(mandate.exposure_labels, exposures, mandate.target_array):
+        print(f"-- {label}: {exposure:.2f} (target {target:.2f})")
+
+
+def batch(args, input_cache: InputCache = None) -> None:
+    # Values the portfolio files against the economy snapshot directories and saves the results.
+    from valuation.batch import BatchValuation
+    economies = [EconomyReader(input_cache).read_economy(CURRENT_DATE, x) for x in args.economies]
+    portfolios = [PortfolioReader().read_portfolio_file(x) for x in args.portfolios]
+    batch_valuation = BatchValuation(portfolios, economies, load_mandate(input_cache), args.workers, args.shard_size)
+    result = batch_valuation.run()
+    result.save(args.output)
+    print(f"* Portfolio values (portfolios x economies) saved to {args.output}")
+    print(result.portfolio_values)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('command', nargs='?', choices=['train', 'value', 'batch'], default='train',
+                        help="Train a trading policy (default), value the input portfolio or run a batch valuation.")
+    parser.add_argument('--economies', nargs='+', default=[os.path.join(ROOT_DIR, 'io', 'input', 'economy')],
+                        help="Economy snapshot directories of the batch valuation.")
+    parser.add_argument('--portfolios', nargs='+',
+                        default=[os.path.join(ROOT_DIR, 'io', 'input', 'portfolio', 'portfolio.csv')],
+                        help="Portfolio files (.csv or .parquet) of the batch valuation.")
+    parser.add_argument('--output', default=os.path.join(ROOT_DIR, 'io', 'output', 'valuation.npz'),
+                        help="Output file of the batch valuation.")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes, defaults to the CPU count.")
+    parser.add_argument('--shard-size', type=int, default=10_000, help="Instruments per valuation shard.")
+    parser.add_argument('--no-cache', action='store_true', help="Parse the input files without the input cache.")
+    parser.add_argument('--rebuild-cache', action='store_true', help="Parse the input files and refresh the cache.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    input_cache = InputCache(CACHE_DIR, enabled=not args.no_cache, rebuild=args.rebuild_cache)
+    if args.command == 'value':
+        value(input_cache)
+    elif args.command == 'batch':
+        batch(args, input_cache)
+    else:
+        train(input_cache)
@@ -1,6 +1,7 @@
 import numpy as np
 from typing import Dict, List, Tuple
 from exposures.base import Exposure
+from exposures.context import ValuationContext
 
 from instruments.portfolio import Portfolio
 from economy.base import Economy
@@ -13,21 +14,56 @@ class Mandate:
         self.targets = [x[1] for x in exposures_and_targets]
         self.instrument_generators = instrument_generators
         self.n_instruments = len(self.instrument_generators)
-        self.n_exposures = len(exposures_and_targets)
+        # Ladder exposures (e.g. BucketedZeroDelta) have one target and one state entry per component.
+        self.exposure_labels = [label for exposure in self.exposures for label in exposure.labels()]
+        self.target_array = np.concatenate([np.atleast_1d(target) for target in self.targets]) \
+            if self.targets else np.zeros(0)
+        self.n_exposures = len(self.exposure_labels)
+        # Re-used while the portfolio and the economy are unchanged, e.g. between a step and a render.
+        self.valuation_context = None
+
+    def get_valuation_context(self, portfolio: Portfolio, economy: Economy) -> ValuationContext:
+        if self.valuation_context is None or not self.valuation_context.is_valid_for(portfolio, economy):
+            self.valuation_context = ValuationContext(portfolio, economy)
+        return self.valuation_context
 
     def exposure_deviations(self, portfolio: Portfolio, economy: Economy, as_array: bool = False) -> dict:
-        deviation = {}
+        deviation, context = {}, self.get_valuation_context(portfolio, economy)
         for k in range(len(self.exposures)):
             exposure, exposure_target = self.exposures[k], self.targets[k]
-            exposure_portfolio = exposure.portfolio_exposure(portfolio, economy)
+            exposure_portfolio = exposure.portfolio_exposure(portfolio, economy, context)
             deviation[exposure.identifier] = self._get_deviation(exposure_portfolio, exposure_target)
         if as_array is True:
-            deviation = np.array(list(deviation.values()))
+            deviation = self._to_array(list(deviation.values()))
         return deviation
 
-    def portfolio_exposures(self, portfolio: Portfolio, economy: Economy):
-        exposures = [exposure.portfolio_exposure(portfolio, economy) for exposure in self.exposures]
-        return np.array(exposures)
+    def portfolio_exposures(self, portfolio: Portfolio, economy: Economy, context: ValuationContext = None):
+        if context is None:
+            context = self.get_valuation_context(portfolio, economy)
+        exposures = [exposure.portfolio_exposure(portfolio, economy, context) for exposure in self.exposures]
+        return self._to_array(exposures)
+
+    def exposures_per_unit(self, economy: Economy) -> np.array:
+        # Exposures of one unit of notional of each generated instrument, shape (exposures x instruments).
+        unit_exposures = [
+            self.trade_exposures(Portfolio([generator(1.0, economy)]), economy)
+            for generator in self.instrument_generators
+        ]
+        return np.stack(unit_exposures, axis=1) if unit_exposures else np.zeros((self.n_exposures, 0))
+
+    def trade_exposures(self, portfolio: Portfolio, economy: Economy) -> np.array:
+        # Exposures of a throwaway portfolio of new trades, which does not replace the shared valuation context.
+        return self.portfolio_exposures(portfolio, economy, ValuationContext(portfolio, economy))
+
+    def deviations(self, exposures: np.array) -> np.array:
+        # Same as exposure_deviations(as_array=True) for already computed portfolio exposures.
+        return self._get_deviation(exposures, self.target_array)
+
+    @staticmethod
+    def _to_array(values: list) -> np.array:
+        if not values:
+            return np.zeros(0)
+        return np.concatenate([np.atleast_1d(value) for value in values])
 
     def _get_deviation(self, exposure_portfolio, exposure_target):
         return np.clip((exposure_portfolio+1e-10) / (exposure_target+1e-10) - 1.0, -1.0, 1.0)
\ No newline at end of file
@@ -0,0 +1,49 @@
+import numpy as np
+from typing import List
+
+from mandate.base import Mandate
+from economy.base import Economy
+from instruments.base import Instrument
+from instruments.portfolio import Portfolio
+
+
+class ExposureTracker:
+    """
+    Running totals of the mandate exposures of a portfolio. All exposures are linear in the
+    positions at a fixed economy, so new trades only add the exposures of the traded instruments.
+    """
+
+    def __init__(self, mandate: Mandate, portfolio: Portfolio, economy: Economy) -> None:
+        self.mandate = mandate
+        self.economy = economy
+        self.exposures = np.zeros(mandate.n_exposures)
+        self.n_full_updates = 0
+        self.n_incremental_updates = 0
+        self.recompute(portfolio, economy)
+
+    def recompute(self, portfolio: Portfolio, economy: Economy) -> np.array:
+        self.economy = economy
+        self.exposures = self.mandate.portfolio_exposures(portfolio, economy)
+        self.n_full_updates += 1
+        return self.exposures
+
+    def add_instruments(self, instruments: List[Instrument], portfolio: Portfolio, economy: Economy) -> np.array:
+        # The portfolio must already hold the instruments, it is only revalued if the economy has changed.
+        if economy is not self.economy:
+            return self.recompute(portfolio, economy)
+        if instruments:
+            self.exposures = self.exposures + self.mandate.trade_exposures(Portfolio(list(instruments)), economy)
+        self.n_incremental_updates += 1
+        return self.exposures
+
+    def add_exposures(self, exposures: np.array) -> np.array:
+        self.exposures = self.exposures + exposures
+        self.n_incremental_updates += 1
+        return self.exposures
+
+    def reset(self, economy: Economy, exposures: np.array) -> None:
+        self.economy = economy
+        self.exposures = np.array(exposures, dtype=float)
+
+    def exposure_deviations(self) -> np.array:
+        return self.mandate.deviations(self.exposures)
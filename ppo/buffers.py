@@ -0,0 +1,73 @@
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class RolloutBuffer:
+    """
+    Rollout data of all workers in a single shared memory block. Worker k writes the rows of its slice
+    in place, and the learner reads all rows as tensors without copies. Pickling a buffer only sends the
+    name of the block, which the receiving process attaches to.
+    """
+
+    def __init__(self, n_workers: int, steps_per_worker: int, obs_dim: int, act_dim: int, name: str = None) -> None:
+        self.n_workers = n_workers
+        self.steps_per_worker = steps_per_worker
+        self.obs_dim = obs_dim
+        self.act_dim = act_dim
+        n_rows = n_workers * steps_per_worker
+        layout = [
+            ("obs", (n_rows, obs_dim), np.float32),
+            ("acts", (n_rows, act_dim), np.float32),
+            ("log_probs", (n_rows,), np.float32),
+            ("rews", (n_rows,), np.float32),
+            # Episode lengths of each worker and the number of episodes they hold.
+            ("lens", (n_workers, steps_per_worker), np.int64),
+            # Observation after the last step of each episode and whether the episode was cut off.
+            ("last_obs", (n_workers, steps_per_worker, obs_dim), np.float32),
+            ("truncated", (n_workers, steps_per_worker), np.float32),
+            ("n_episodes", (n_workers,), np.int64)
+        ]
+        sizes = [self._aligned(int(np.prod(shape)) * np.dtype(dtype).itemsize) for _, shape, dtype in layout]
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=sum(sizes) if self.owner else 0)
+        offset = 0
+        for (field, shape, dtype), size in zip(layout, sizes):
+            setattr(self, field, np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset))
+            offset += size
+        # The creating process removes the block once the buffer is garbage collected or at exit.
+        self._finalizer = weakref.finalize(self, self._release, self.shm, self.owner)
+
+    @staticmethod
+    def _aligned(n_bytes: int) -> int:
+        return (n_bytes + 7) // 8 * 8
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory, owner: bool) -> None:
+        try:
+            shm.close()
+        except BufferError:
+            # Arrays (or tensors) still view the block, the mapping is released with them.
+            pass
+        if owner:
+            shm.unlink()
+
+    def rows(self, worker: int) -> slice:
+        return slice(worker * self.steps_per_worker, (worker + 1) * self.steps_per_worker)
+
+    def batch_lens(self) -> list:
+        return [int(x) for x in self.episodes(self.lens)]
+
+    def episodes(self, field: np.ndarray) -> np.ndarray:
+        # Concatenates the entries of the episodes that the workers hold in a per-episode field.
+        return np.concatenate([field[worker, :self.n_episodes[worker]] for worker in range(self.n_workers)])
+
+    def close(self) -> None:
+        self._finalizer()
+
+    def __getstate__(self) -> tuple:
+        return self.n_workers, self.steps_per_worker, self.obs_dim, self.act_dim, self.shm.name
+
+    def __setstate__(self, state: tuple) -> None:
+        n_workers, steps_per_worker, obs_dim, act_dim, name = state
+        self.__init__(n_workers, steps_per_worker, obs_dim, act_dim, name=name)
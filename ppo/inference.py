@@ -0,0 +1,50 @@
+import math
+import torch
+
+
+class ActionSampler:
+    """
+    Rollout-time action sampling for a fixed batch of observations. The actor runs without autograd, and the
+    diagonal Gaussian is sampled and evaluated in preallocated tensors, which are returned as NumPy views.
+    """
+
+    def __init__(self, actor, batch_size, obs_dim, act_dim, jit=False):
+        self.batch_size = batch_size
+        self.act_dim = act_dim
+        # Preallocated inputs and outputs, the NumPy arrays share memory with the tensors.
+        self.obs = torch.zeros((batch_size, obs_dim))
+        self.noise = torch.zeros((batch_size, act_dim))
+        self.squared_noise = torch.zeros((batch_size, act_dim))
+        self.actions = torch.zeros((batch_size, act_dim))
+        self.log_probs = torch.zeros(batch_size)
+        self.obs_array, self.actions_array, self.log_probs_array = \
+            self.obs.numpy(), self.actions.numpy(), self.log_probs.numpy()
+        self.std = torch.ones(act_dim)
+        self.log_norm = 0.5 * act_dim * math.log(2.0 * math.pi)
+        # A traced actor skips the Python forward pass, it shares its parameters with the actor.
+        self.policy = self._trace(actor) if jit else actor
+
+    def set_covariance(self, cov_mat):
+        # The covariance of the policy is diagonal, only its standard deviations are needed.
+        self.std = torch.sqrt(torch.diagonal(cov_mat)).detach().clone()
+        self.log_norm = torch.sum(torch.log(self.std)).item() + 0.5 * self.act_dim * math.log(2.0 * math.pi)
+
+    @torch.no_grad()
+    def sample(self, obs):
+        # 1. Copy observations into the input tensor and compute the mean actions.
+        self.obs_array[:] = obs
+        mean = self.policy(self.obs)
+
+        # 2. Sample actions as mean + std * noise.
+        torch.randn(self.noise.shape, out=self.noise)
+        torch.addcmul(mean, self.noise, self.std, out=self.actions)
+
+        # 3. Log density of the diagonal Gaussian: -0.5 * |noise|^2 - sum(log(std)) - 0.5 * k * log(2 pi).
+        torch.square(self.noise, out=self.squared_noise)
+        torch.sum(self.squared_noise, dim=1, out=self.log_probs)
+        self.log_probs.mul_(-0.5).sub_(self.log_norm)
+        return self.actions_array, self.log_probs_array
+
+    def _trace(self, actor):
+        with torch.no_grad():
+            return torch.jit.trace(actor, self.obs, check_trace=False)
@@ -1,4 +1,5 @@
 import gym
+import copy
 import time
 import torch
 import numpy as np
@@ -8,11 +9,12 @@ from torch.distributions import MultivariateNormal
 
 from ppo.networks import ActorNN, CriticNN
 from ppo.rollout import RolloutManager
+from ppo.returns import discounted_returns, generalized_advantages
 
 
 class ProximalPolicyOptimization:
 
-    def __init__(self, env, config):
+    def __init__(self, env, config, env_fn=None):
 
         # 1. Check if environment is continuous.
         assert type(env.observation_space) == gym.spaces.Box, "Discrete observation space!"
@@ -23,6 +25,8 @@ class ProximalPolicyOptimization:
 
         # 3. Initialize environment variables.
         self.env = env
+        # Rollout workers build their own environments, by default as copies of the given one.
+        self.env_fn = env_fn if env_fn is not None else lambda: copy.deepcopy(env)
         self.obs_dim = env.observation_space.shape[0]
         self.act_dim = env.action_space.shape[0]
 
@@ -55,12 +59,12 @@ class ProximalPolicyOptimization:
 
             # 3.1 Collect data from environment by rolling out the current policy.
             start_rollout = time.time()
-            batch_obs, batch_acts, batch_log_probs, batch_rtgs, batch_lens = self.policy_rollout()
+            batch_obs, batch_acts, batch_log_probs, batch_rews, batch_lens = self.policy_rollout()
             end_rollout = time.time()
 
             # 3.2 Update current policy using the collected data.
             start_update = time.time()
-            self.policy_update(batch_obs, batch_acts, batch_log_probs, batch_rtgs)
+            self.policy_update(batch_obs, batch_acts, batch_log_probs, batch_rews, batch_lens)
             end_update = time.time()
 
             # 3.3 Update step counters.
@@ -71,7 +75,7 @@ class ProximalPolicyOptimization:
             self._decay_action_variance(steps, total_steps)
 
             # 3.5 Log progress.
-            avg_ep_reward = torch.sum(batch_rtgs).item() / len(batch_lens)
+            avg_ep_reward = torch.sum(batch_rews).item() / len(batch_lens)
             print(f"* Iteration #{iterations}", flush=True)
             print(f"{'-- Steps: '}{steps}")
             print(f"{'-- Rollout + Update Time: '}{round(end_rollout-start_rollout, 2)} + {round(end_update-start_update, 2)}")
@@ -84,11 +88,10 @@ class ProximalPolicyOptimization:
         print(f"* Proximal Policy Optimization Finished")
         print(f"-- Learning Time: {end_learn-start_learn}")
 
-    def policy_update(self, batch_obs, batch_acts, batch_log_probs, batch_rtgs):
+    def policy_update(self, batch_obs, batch_acts, batch_log_probs, batch_rews, batch_lens):
 
-        # 1. Calculate advantage for the last rollout.
-        v, _ = self.evaluate(batch_obs, batch_acts)
-        a_k = batch_rtgs - v.detach()
+        # 1. Calculate advantage and critic targets for the last rollout.
+        batch_targets, a_k = self.compute_advantages(batch_obs, batch_rews, batch_lens)
         a_k = (a_k - a_k.mean()) / (a_k.std() + 1e-10)
 
         # 2. Repeatedly loop through rollout data to update policy.
@@ -106,7 +109,7 @@ class ProximalPolicyOptimization:
 
             # 2.4 Calculate actor and critic losses.
             actor_loss = (-torch.min(surrogate_loss_1, surrogate_loss_2)).mean()
-            critic_loss = nn.MSELoss()(v, batch_rtgs)
+            critic_loss = nn.MSELoss()(v, batch_targets)
 
             # 2.5 Calculate gradients and perform backward propagation for actor network.
             self.actor_optimizer.zero_grad()
@@ -118,6 +121,28 @@ class ProximalPolicyOptimization:
             critic_loss.backward()
             self.critic_optimizer.step()
 
+    def compute_advantages(self, batch_obs, batch_rews, batch_lens):
+        if self.config.advantage_estimator not in ("rtg", "gae"):
+            raise ValueError(f"Unknown advantage estimator {self.config.advantage_estimator}!")
+
+        # 1. Critic values of the states after truncated episodes, terminated episodes are not bootstrapped.
+        batch_last_obs, batch_truncated = self.rollout_manager.episode_ends()
+        with torch.no_grad():
+            v = self.critic(batch_obs).squeeze(-1)
+            bootstrap_values = (self.critic(batch_last_obs).squeeze(-1) * batch_truncated).numpy()
+
+        # 2. Bootstrapped rewards-to-go are the critic targets, advantages are their excess over the critic values.
+        if self.config.advantage_estimator == "rtg":
+            returns = discounted_returns(batch_rews.numpy(), batch_lens, self.config.gamma, bootstrap_values)
+            returns = torch.tensor(returns, dtype=torch.float)
+            return returns, returns - v
+
+        # 3. Generalized advantage estimation, the lambda-returns are the critic targets.
+        advantages, returns = generalized_advantages(
+            batch_rews.numpy(), v.numpy(), bootstrap_values, batch_lens, self.config.gamma, self.config.gae_lambda
+        )
+        return torch.tensor(returns, dtype=torch.float), torch.tensor(advantages, dtype=torch.float)
+
     def policy_rollout(self):
         return self.rollout_manager.rollout(self.cov_mat)
 
@@ -133,6 +158,7 @@ class ProximalPolicyOptimization:
         print(f"* Proximal Policy Optimization", flush=True)
         print(f"-- Total Steps: {total_timesteps}")
         print(f"-- Rollout Actors: {self.config.actors}")
+        print(f"-- Environments Per Actor: {self.config.envs_per_actor}")
         print(f"-- Steps Per Rollout: {self.config.steps_per_rollout}")
         print(f"-- Updates Per Iteration: {self.config.updates_per_iteration}")
         print(f"\n")
@@ -145,10 +171,14 @@ class ProximalPolicyOptimization:
 
     def _get_rollout_manager(self):
         return RolloutManager(
-            env=self.env,
+            env_fn=self.env_fn,
+            obs_dim=self.obs_dim,
+            act_dim=self.act_dim,
             actor=self.actor,
-            gamma=self.config.gamma,
             steps_per_rollout=self.config.steps_per_rollout,
             steps_per_episode=self.config.steps_per_episode,
-            n_workers=self.config.actors
+            n_workers=self.config.actors,
+            n_envs=self.config.envs_per_actor,
+            seed=self.config.seed,
+            jit=self.config.jit_actor
         )
\ No newline at end of file
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def discounted_returns(rews, lens, gamma, bootstrap_values=None):
+    """
+    Discounted rewards-to-go of consecutive episodes with lengths lens. Truncated episodes can be bootstrapped
+    with the value of the state after their last step, terminated episodes have a bootstrap value of zero.
+    """
+    episodes, steps, shape = _episode_matrix(lens)
+    padded = np.zeros(shape)
+    padded[episodes, steps] = rews
+    if bootstrap_values is not None:
+        padded[np.arange(shape[0]), np.asarray(lens) - 1] += gamma * np.asarray(bootstrap_values)
+    return _discounted_cumsum(padded, gamma)[episodes, steps]
+
+
+def generalized_advantages(rews, values, bootstrap_values, lens, gamma, lam):
+    """
+    Generalized advantage estimates GAE(gamma, lambda) and the lambda-returns, which are the critic targets.
+    The value after the last step of an episode is its bootstrap value instead of the next episode's first value.
+    """
+    # 1. Values of the next states, the last step of each episode uses its bootstrap value.
+    values = np.asarray(values, dtype=float)
+    next_values = np.zeros_like(values)
+    next_values[:-1] = values[1:]
+    next_values[np.cumsum(lens) - 1] = bootstrap_values
+
+    # 2. Temporal difference errors, discounted by gamma * lambda within each episode.
+    episodes, steps, shape = _episode_matrix(lens)
+    padded = np.zeros(shape)
+    padded[episodes, steps] = np.asarray(rews) + gamma * next_values - values
+    advantages = _discounted_cumsum(padded, gamma * lam)[episodes, steps]
+    return advantages, advantages + values
+
+
+def _episode_matrix(lens):
+    # Row (episode) and column (step) of every transition in a zero padded (episodes x max length) matrix.
+    lens = np.asarray(lens, dtype=int)
+    episodes = np.repeat(np.arange(len(lens)), lens)
+    steps = np.arange(np.sum(lens)) - np.repeat(np.cumsum(lens) - lens, lens)
+    return episodes, steps, (len(lens), int(np.max(lens, initial=0)))
+
+
+def _discounted_cumsum(x, discount):
+    # Backward recursion y_t = x_t + discount * y_{t+1}, vectorized over the episodes in the rows.
+    y, running = np.zeros_like(x), np.zeros(x.shape[0])
+    for t in reversed(range(x.shape[1])):
+        running = x[:, t] + discount * running
+        y[:, t] = running
+    return y
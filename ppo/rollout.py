@@ -1,24 +1,38 @@
 import torch
 import numpy as np
 from multiprocess import Process, Pipe
-from torch.distributions import MultivariateNormal
+
+from ppo.buffers import RolloutBuffer
+from ppo.inference import ActionSampler
+from ppo.vec_env import VecEnv
 
 
 class RolloutManager:
 
-    def __init__(self, env, actor, gamma, steps_per_rollout, steps_per_episode, n_workers):
-        self.envs = self._clone_env(env, n_workers)
+    def __init__(self, env_fn, obs_dim, act_dim, actor, steps_per_rollout, steps_per_episode, n_workers,
+                 n_envs=1, seed=None, jit=False):
+        self.env_fn = env_fn
         self.actor = actor
-        self.gamma = gamma
         self.steps_per_rollout = steps_per_rollout
         self.steps_per_episode = steps_per_episode
         self.n_workers = n_workers
+        # Every worker steps n_envs environments in lockstep, each filling an equal share of its rows.
+        if steps_per_rollout % n_envs != 0:
+            raise ValueError("Steps per rollout must be a multiple of the number of environments per worker!")
+        self.n_envs = n_envs
+        self.jit = jit
+        self.steps_per_env = steps_per_rollout // n_envs
         self.locals = []
+        # Workers write their transitions into shared memory, the pipes only carry commands and step counts.
+        self.obs_dim, self.act_dim = obs_dim, act_dim
+        self.buffer = RolloutBuffer(n_workers, steps_per_rollout, self.obs_dim, self.act_dim)
+        # Parameters are moved to shared memory, such that workers act with the latest policy.
+        self.actor.share_memory()
 
-        for env in self.envs[1:]:
+        for worker_idx, worker_seed in enumerate(self._worker_seeds(seed, n_workers)):
             local, remote = Pipe()
             self.locals.append(local)
-            p = Process(target=self.worker, args=(remote, env))
+            p = Process(target=self.worker, args=(remote, worker_idx, worker_seed))
             p.daemon = True
             p.start()
             remote.close()
@@ -26,94 +40,92 @@ class RolloutManager:
     def rollout(self, cov_mat):
         for local in self.locals:
             local.send(("rollout", cov_mat))
-        rollout_data = [self._rollout_env(self.envs[0], cov_mat)] + [local.recv() for local in self.locals]
-        return self._merge_rollout_data(rollout_data)
-
-    def worker(self, conn, env):
+        for local in self.locals:
+            local.recv()
+        return self._read_rollout_data()
+
+    def worker(self, conn, worker_idx, worker_seed):
+        # 1. Build and seed environments of its own, actions are sampled with a seeded torch generator.
+        vec_env = VecEnv(self.env_fn, self.n_envs, max_episode_steps=self.steps_per_episode)
+        vec_env.seed(worker_seed)
+        torch.manual_seed(worker_seed)
+        torch.set_num_threads(1)
+        sampler = ActionSampler(self.actor, self.n_envs, self.obs_dim, self.act_dim, jit=self.jit)
+
+        # 2. Collect rollouts on request.
         while True:
             cmd, data = conn.recv()
             if cmd == "rollout":
-                conn.send(self._rollout_env(env, data))
-
-    def _rollout_env(self, env, cov_mat):
-        # 1. Initialize rollout value lists.
-        batch_obs, batch_acts, batch_log_probs, batch_rews, batch_lens = [], [], [], [], []
-
-        # 2. Initialize step counter.
-        steps = 0
-
-        # 3. Collect data from multiple episodes..
-        while steps < self.steps_per_rollout:
-
-            # 3.1 Initialize episode rewards and reset environment.
-            obs, ep_rews = env.reset(), []
-
-            # 3.2 Collect data from single episode.
-            for ep_t in range(self.steps_per_episode):
-
-                # 3.2.1 Store previous state.
-                batch_obs.append(obs)
-
-                # 3.2.2 Collect data from single step.
-                action, log_prob = self.get_action(obs, cov_mat)
-                obs, rew, done, _ = env.step(action)
-
-                # 3.2.3 Store data from step.
-                ep_rews.append(rew)
-                batch_acts.append(action)
-                batch_log_probs.append(log_prob)
-
-                # 3.2.4 Increment counter and check terminal condition.
-                steps += 1
-                if done:
-                    break
-
-            # 3.3 Store data from previous episode.
-            batch_lens.append(ep_t + 1)
-            batch_rews.append(ep_rews)
-
-        # 4. Transform collected data to tensor format.
-        batch_rtgs = self.compute_rtgs(batch_rews)
-
-        # 5. Store rollout in buffer.
-        return [batch_obs, batch_acts, batch_log_probs, batch_rtgs, batch_lens]
-
-    def _merge_rollout_data(self, rollout_data):
-        batch_obs = []
-        batch_acts = []
-        batch_log_probs = []
-        batch_rtgs = []
-        batch_lens = []
-        for k in range(len(rollout_data)):
-            batch_obs += rollout_data[k][0]
-            batch_acts += rollout_data[k][1]
-            batch_log_probs += rollout_data[k][2]
-            batch_rtgs += rollout_data[k][3]
-            batch_lens += rollout_data[k][4]
-        batch_obs = torch.tensor(np.array(batch_obs), dtype=torch.float)
-        batch_acts = torch.tensor(np.array(batch_acts), dtype=torch.float)
-        batch_log_probs = torch.tensor(np.array(batch_log_probs), dtype=torch.float)
-        batch_rtgs = torch.tensor(np.array(batch_rtgs), dtype=torch.float)
-        return batch_obs, batch_acts, batch_log_probs, batch_rtgs, batch_lens
-
-    def compute_rtgs(self, batch_rews):
-        batch_rtgs = []
-        for ep_rews in reversed(batch_rews):
-            discounted_reward = 0
-            for rew in reversed(ep_rews):
-                discounted_reward = rew + discounted_reward * self.gamma
-                batch_rtgs.insert(0, discounted_reward)
-        return batch_rtgs
-
-    def get_action(self, obs, cov_mat):
-        mean = self.actor(obs)
-        dist = MultivariateNormal(mean, cov_mat)
-        action = dist.sample()
-        log_prob = dist.log_prob(action)
-        return action.detach().numpy(), log_prob.detach()
-
-    def _clone_env(self, env, n_workers):
-        return [env for _ in range(n_workers)]
+                conn.send(self._rollout_env(vec_env, sampler, data, worker_idx))
+
+    def _rollout_env(self, vec_env, sampler, cov_mat, worker_idx):
+        # 1. Get the rows of the worker in the shared buffer, environment k fills a contiguous block of rows.
+        rows, n_envs, steps_per_env = self.buffer.rows(worker_idx), self.n_envs, self.steps_per_env
+        buffer_obs = self.buffer.obs[rows].reshape(n_envs, steps_per_env, -1)
+        buffer_acts = self.buffer.acts[rows].reshape(n_envs, steps_per_env, -1)
+        buffer_log_probs = self.buffer.log_probs[rows].reshape(n_envs, steps_per_env)
+        buffer_rews = self.buffer.rews[rows].reshape(n_envs, steps_per_env)
+
+        # 2. Reset environments and initialize the episode lengths and ends of each environment.
+        sampler.set_covariance(cov_mat)
+        obs, ep_lens, ep_starts = vec_env.reset(), [[] for _ in range(n_envs)], np.zeros(n_envs, dtype=int)
+        ep_ends = [[] for _ in range(n_envs)]
+
+        # 3. Step all environments in lockstep, finished episodes are reset by the vectorized environment.
+        for t in range(steps_per_env):
+
+            # 3.1 Store previous states.
+            buffer_obs[:, t] = obs
+
+            # 3.2 Collect data from a single step of all environments.
+            actions, log_probs = sampler.sample(obs)
+            obs, rews, dones, infos = vec_env.step(actions)
+
+            # 3.3 Store data from step.
+            buffer_acts[:, t] = actions
+            buffer_log_probs[:, t] = log_probs
+            buffer_rews[:, t] = rews
+
+            # 3.4 Store lengths and last observations of the finished episodes.
+            for k in np.flatnonzero(dones):
+                ep_lens[k].append(t + 1 - ep_starts[k])
+                ep_ends[k].append((infos[k]["truncated"], infos[k]["terminal_observation"]))
+                ep_starts[k] = t + 1
+
+        # 4. The last episode of each environment is cut off at the end of the rollout.
+        for k in range(n_envs):
+            if ep_starts[k] < steps_per_env:
+                ep_lens[k].append(steps_per_env - ep_starts[k])
+                ep_ends[k].append((True, obs[k]))
+        batch_lens = [int(n) for lens in ep_lens for n in lens]
+        batch_ends = [end for ends in ep_ends for end in ends]
+
+        # 5. Store episodes in buffer, the learner computes the returns and bootstraps truncated episodes.
+        n_episodes = len(batch_lens)
+        self.buffer.lens[worker_idx, :n_episodes] = batch_lens
+        self.buffer.truncated[worker_idx, :n_episodes] = [truncated for truncated, _ in batch_ends]
+        self.buffer.last_obs[worker_idx, :n_episodes] = [last_obs for _, last_obs in batch_ends]
+        self.buffer.n_episodes[worker_idx] = n_episodes
+        return n_envs * steps_per_env
+
+    def _read_rollout_data(self):
+        # Tensors share memory with the buffer, they are overwritten by the next rollout.
+        batch_obs = torch.from_numpy(self.buffer.obs)
+        batch_acts = torch.from_numpy(self.buffer.acts)
+        batch_log_probs = torch.from_numpy(self.buffer.log_probs)
+        batch_rews = torch.from_numpy(self.buffer.rews)
+        return batch_obs, batch_acts, batch_log_probs, batch_rews, self.buffer.batch_lens()
+
+    def episode_ends(self):
+        # Last observation and truncation flag of each episode of the last rollout.
+        batch_last_obs = torch.from_numpy(self.buffer.episodes(self.buffer.last_obs))
+        batch_truncated = torch.from_numpy(self.buffer.episodes(self.buffer.truncated))
+        return batch_last_obs, batch_truncated
+
+    @staticmethod
+    def _worker_seeds(seed, n_workers):
+        # The seed of the run fixes the seeds of all workers, no seed draws them from the OS entropy.
+        return [int(x) for x in np.random.SeedSequence(seed).generate_state(n_workers)]
 
 
 
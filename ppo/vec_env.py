@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class VecEnv:
+    """
+    Holds K environments that are stepped in lockstep, such that the policy acts on a (K x obs_dim) batch.
+    Finished or truncated episodes are reset automatically, their last observation is kept in the info.
+    """
+
+    def __init__(self, env_fn, n_envs, max_episode_steps=None):
+        self.envs = [env_fn() for _ in range(n_envs)]
+        self.n_envs = n_envs
+        self.max_episode_steps = max_episode_steps
+        self.observation_space = self.envs[0].observation_space
+        self.action_space = self.envs[0].action_space
+        self.obs = np.zeros((n_envs,) + self.observation_space.shape, dtype=np.float32)
+        self.episode_steps = np.zeros(n_envs, dtype=np.int64)
+
+    def seed(self, seed=None):
+        # Every environment gets its own seed derived from the seed of the worker.
+        seeds = [int(x) for x in np.random.SeedSequence(seed).generate_state(self.n_envs)]
+        for env, env_seed in zip(self.envs, seeds):
+            env.seed(env_seed)
+        return seeds
+
+    def reset(self):
+        for k, env in enumerate(self.envs):
+            self.obs[k] = env.reset()
+        self.episode_steps[:] = 0
+        return self.obs.copy()
+
+    def step(self, actions):
+        # 1. Initialize step results.
+        rews = np.zeros(self.n_envs, dtype=np.float32)
+        dones = np.zeros(self.n_envs, dtype=bool)
+        infos = []
+
+        # 2. Step all environments with their row of the actions.
+        for k, env in enumerate(self.envs):
+            obs, rews[k], done, info = env.step(actions[k])
+            self.episode_steps[k] += 1
+            truncated = not done and self.max_episode_steps is not None \
+                and self.episode_steps[k] >= self.max_episode_steps
+
+            # 2.1 Reset finished episodes, the returned observation is the first one of the next episode.
+            if done or truncated:
+                info = dict(info, terminal_observation=np.array(obs, dtype=np.float32), truncated=truncated)
+                obs = env.reset()
+                self.episode_steps[k] = 0
+            self.obs[k], dones[k] = obs, done or truncated
+            infos.append(info)
+        return self.obs.copy(), rews, dones, infos
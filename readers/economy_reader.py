@@ -1,32 +1,51 @@
+from __future__ import annotations
+
 import os
-import pandas as pd
 import numpy as np
 from datetime import datetime
-from typing import List, Dict
+from typing import TYPE_CHECKING, Dict, List
 
 from utils.dates import DateHelper
 from economy.base import Economy
 from economy.observables.exchange_rate import ExchangeRate
 from economy.observables.share_price import SharePrice
 from economy.term_structures.yield_curve import YieldCurve
+from readers.input_cache import InputCache
+
+if TYPE_CHECKING:
+    # Pandas is only imported when input files are parsed.
+    import pandas as pd
 
 
 class EconomyReader:
 
-    def __init__(self) -> None:
+    def __init__(self, input_cache: InputCache = None) -> None:
+        self.input_cache = input_cache
         self.date_helper = DateHelper()
         self.yield_curve_csv = "yield_curves.csv"
         self.exchange_rate_csv = "exchange_rates.csv"
         self.share_price_csv = "share_prices.csv"
 
     def read_economy(self, current_date: datetime, economy_path: str) -> Economy:
+        if self.input_cache is None:
+            observables = self._read_observables(economy_path)
+        else:
+            csv_paths = [os.path.join(economy_path, x)
+                         for x in [self.yield_curve_csv, self.exchange_rate_csv, self.share_price_csv]]
+            observables = self.input_cache.get("economy", csv_paths, lambda: self._read_observables(economy_path))
+        yield_curves, exchange_rates, share_prices = observables
+        return Economy(current_date=current_date,  yield_curves=yield_curves,
+                       share_prices=share_prices, exchange_rates=exchange_rates)
+
+    def _read_observables(self, economy_path: str) -> tuple:
+        # The observables do not depend on the current date, hence they can be cached.
         yield_curves = self._read_yield_curves(economy_path)
         exchange_rates = self._read_exchange_rates(economy_path)
         share_prices = self._read_share_prices(economy_path)
-        return Economy(current_date=current_date,  yield_curves=yield_curves,
-                       share_prices=share_prices, exchange_rates=exchange_rates)
+        return yield_curves, exchange_rates, share_prices
 
     def _read_share_prices(self, economy_path: str) -> Dict[str, SharePrice]:
+        import pandas as pd
         shr_path = os.path.join(economy_path, self.share_price_csv)
         shr_df = pd.read_csv(shr_path)
         share_prices = shr_df.groupby(by="Identifier").apply(self._construct_share_price)
@@ -40,6 +59,7 @@ class EconomyReader:
         return SharePrice(ticker_symbol=identifier, currency=currency, value=share_price)
 
     def _read_exchange_rates(self, economy_path: str) -> Dict[str, ExchangeRate]:
+        import pandas as pd
         fx_path = os.path.join(economy_path, self.exchange_rate_csv)
         fx_df = pd.read_csv(fx_path)
         exchange_rates = fx_df.groupby(by="Identifier").apply(self._construct_exchange_rate)
@@ -53,6 +73,7 @@ class EconomyReader:
         return ExchangeRate(base_currency=base_currency, quote_currency=quote_currency, value=exchange_rate)
 
     def _read_yield_curves(self, economy_path: str) -> Dict[str, YieldCurve]:
+        import pandas as pd
         curve_path = os.path.join(economy_path, self.yield_curve_csv)
         curve_df = pd.read_csv(curve_path)
         yield_curves = curve_df.groupby(by="Identifier").apply(self._construct_yield_curve)
@@ -0,0 +1,92 @@
+import os
+import pickle
+import hashlib
+from typing import Callable, List
+
+# Bump when the cache file format changes, which invalidates all cache entries.
+CACHE_VERSION = 2
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Packages defining the cached objects, a change to any of their sources invalidates all cache entries.
+SOURCE_PACKAGES = ["economy", "exposures", "instruments", "mandate", "readers", "utils"]
+
+
+def source_hash(packages: List[str] = SOURCE_PACKAGES) -> str:
+    digest = hashlib.sha1()
+    for package in packages:
+        for dir_path, dir_names, file_names in os.walk(os.path.join(ROOT_DIR, package)):
+            dir_names.sort()
+            for file_name in sorted(x for x in file_names if x.endswith(".py")):
+                file_path = os.path.join(dir_path, file_name)
+                digest.update(os.path.relpath(file_path, ROOT_DIR).encode())
+                with open(file_path, "rb") as source_file:
+                    digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+class InputCache:
+    """
+    Pickled reader outputs keyed by the path, modification time and size of the input files they were read from,
+    and by a hash of the sources of the cached classes. Entries that can not be loaded or whose key does not match
+    are rebuilt and overwritten.
+    """
+
+    _source_hash = None
+
+    def __init__(self, cache_dir: str, enabled: bool = True, rebuild: bool = False) -> None:
+        self.cache_dir = cache_dir
+        # Disabled caches always build. With rebuild, entries are built once and then cached again.
+        self.enabled = enabled
+        self.rebuild = rebuild
+        self.rebuilt = set()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, input_paths: List[str], build: Callable, options: tuple = ()):
+        if not self.enabled:
+            return build()
+        key = self._key(input_paths, options)
+        cache_path = os.path.join(self.cache_dir, f"{name}_{hashlib.sha1(repr(key).encode()).hexdigest()[:16]}.pkl")
+        if not (self.rebuild and cache_path not in self.rebuilt):
+            value = self._load(cache_path, key)
+            if value is not None:
+                self.hits += 1
+                return value
+        self.misses += 1
+        value = build()
+        self._dump(cache_path, key, value)
+        self.rebuilt.add(cache_path)
+        return value
+
+    @classmethod
+    def _key(cls, input_paths: List[str], options: tuple) -> tuple:
+        # The sources are hashed once per process.
+        if cls._source_hash is None:
+            InputCache._source_hash = source_hash()
+        files = []
+        for input_path in input_paths:
+            stat = os.stat(input_path)
+            files.append((os.path.abspath(input_path), stat.st_mtime_ns, stat.st_size))
+        return CACHE_VERSION, cls._source_hash, tuple(files), options
+
+    @staticmethod
+    def _load(cache_path: str, key: tuple):
+        # The key is stored ahead of the value, such that stale objects are never unpickled.
+        try:
+            with open(cache_path, "rb") as cache_file:
+                if pickle.load(cache_file) != key:
+                    return None
+                return pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError):
+            return None
+
+    def _dump(self, cache_path: str, key: tuple, value) -> None:
+        # Written to a temporary file first, such that concurrent readers never see a partial entry.
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as cache_file:
+            pickle.dump(key, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+
+    def __repr__(self) -> str:
+        return f"InputCache(dir={self.cache_dir}, enabled={self.enabled}, hits={self.hits}, misses={self.misses})"
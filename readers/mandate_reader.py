@@ -1,29 +1,55 @@
+from __future__ import annotations
+
 import os
-import pandas as pd
+from typing import TYPE_CHECKING
+import numpy as np
 
 from mandate.base import Mandate
+from exposures.base import ExposureType
 from exposures.factory import ExposureFactory
 from mandate.generator_factory import InstrumentGeneratorFactory
+from readers.input_cache import InputCache
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class MandateReader:
 
-    def __init__(self) -> None:
+    def __init__(self, input_cache: InputCache = None) -> None:
+        self.input_cache = input_cache
         self.exposure_csv = "exposures.csv"
         self.instrument_csv = "instruments.csv"
         self.exposure_factory = ExposureFactory()
         self.instrument_generator_factory = InstrumentGeneratorFactory()
 
     def read_mandate(self, mandate_path: str) -> Mandate:
-        exposures_and_targets = self._read_exposures_and_targets(mandate_path)
-        instrument_generators = self._read_instrument_generators(mandate_path)
+        if self.input_cache is None:
+            exposures_and_targets, generator_specs = self._read_mandate_inputs(mandate_path)
+        else:
+            csv_paths = [os.path.join(mandate_path, x) for x in [self.exposure_csv, self.instrument_csv]]
+            exposures_and_targets, generator_specs = self.input_cache.get(
+                "mandate", csv_paths, lambda: self._read_mandate_inputs(mandate_path)
+            )
+        instrument_generators = [
+            self.instrument_generator_factory.create_instrument_generator(instrument_type, **kwargs)
+            for instrument_type, kwargs in generator_specs
+        ]
         return Mandate(exposures_and_targets, instrument_generators)
 
+    def _read_mandate_inputs(self, mandate_path: str) -> tuple:
+        # Instrument generators are closures, hence only their specifications (type, kwargs) can be cached.
+        exposures_and_targets = self._read_exposures_and_targets(mandate_path)
+        generator_specs = self._read_instrument_generator_specs(mandate_path)
+        return exposures_and_targets, generator_specs
+
     def _read_exposures_and_targets(self, mandate_path: str) -> list:
+        import pandas as pd
         # Todo: Ugly reader but it works for now...
         exposures_and_targets = []
         exposure_path = os.path.join(mandate_path, self.exposure_csv)
         exposure_df = pd.read_csv(exposure_path)
+        ladders = {}
         for k in range(len(exposure_df)):
             kwargs = {'identifier': exposure_df.iloc[k, 0]}
             if not pd.isnull(exposure_df.iloc[k, 2]):
@@ -32,12 +58,27 @@ class MandateReader:
                 kwargs['tenor'] = exposure_df.iloc[k, 3]
             exposure_type = exposure_df.iloc[k, 1]
             target = exposure_df.iloc[k, 4]
+            if exposure_type == ExposureType.BucketedZeroDelta.value:
+                # A ladder spans one row per bucket sharing the same identifier.
+                if kwargs['identifier'] not in ladders:
+                    ladders[kwargs['identifier']] = (len(exposures_and_targets), kwargs['curve_identifier'], [], [])
+                    exposures_and_targets.append(None)
+                ladders[kwargs['identifier']][2].append(float(kwargs['tenor']))
+                ladders[kwargs['identifier']][3].append(target)
+                continue
             exposure = self.exposure_factory.create_exposure(exposure_type, **kwargs)
             exposures_and_targets.append((exposure, target))
+        for identifier, (idx, curve_identifier, tenors, targets) in ladders.items():
+            exposure = self.exposure_factory.create_exposure(
+                ExposureType.BucketedZeroDelta.value, identifier=identifier, curve_identifier=curve_identifier,
+                tenors=tenors
+            )
+            exposures_and_targets[idx] = (exposure, np.array(targets, dtype=float))
         return exposures_and_targets
 
-    def _read_instrument_generators(self, mandate_path: str):
-        instrument_generators = []
+    def _read_instrument_generator_specs(self, mandate_path: str) -> list:
+        import pandas as pd
+        generator_specs = []
         instrument_path = os.path.join(mandate_path, self.instrument_csv)
         instrument_df = pd.read_csv(instrument_path)
         for k in range(len(instrument_df)):
@@ -54,6 +95,5 @@ class MandateReader:
                 kwargs['tenor'] = tenor
             if not pd.isnull(ticker_symbol):
                 kwargs['ticker_symbol'] = ticker_symbol
-            instrument_generator = self.instrument_generator_factory.create_instrument_generator(instrument_type, **kwargs)
-            instrument_generators.append(instrument_generator)
-        return instrument_generators
\ No newline at end of file
+            generator_specs.append((instrument_type, kwargs))
+        return generator_specs
\ No newline at end of file
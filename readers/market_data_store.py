@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import json
+import numpy as np
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List
+
+from utils.dates import DateHelper
+from economy.base import Economy
+from economy.observables.exchange_rate import ExchangeRate
+from economy.observables.share_price import SharePrice
+from economy.term_structures.yield_curve import YieldCurve
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class MarketDataStore:
+    """
+    Dated market data with one row per date and one column per curve node, share price or exchange rate.
+    The store is built once from CSV history and its .npy files are memory mapped when opened, such that
+    the economy of any date is read from a single row found through a per day lookup table.
+    Only building the store requires pandas.
+    """
+
+    yield_curve_csv = "yield_curves.csv"
+    exchange_rate_csv = "exchange_rates.csv"
+    share_price_csv = "share_prices.csv"
+    metadata_json = "metadata.json"
+    fields = ("dates", "date_rows", "yield_curves", "share_prices", "exchange_rates")
+
+    def __init__(self, store_path: str, date_helper: DateHelper = DateHelper()) -> None:
+        self.date_helper = date_helper
+        with open(os.path.join(store_path, self.metadata_json)) as metadata_file:
+            self.metadata = json.load(metadata_file)
+        arrays = {field: np.load(os.path.join(store_path, f"{field}.npy"), mmap_mode="r") for field in self.fields}
+        self.dates = arrays["dates"]
+        # Row of the last date on or before each day from the first date onwards.
+        self.date_rows = arrays["date_rows"]
+        self.yield_curves = arrays["yield_curves"]
+        self.share_prices = arrays["share_prices"]
+        self.exchange_rates = arrays["exchange_rates"]
+        self.curve_tenors = {x["identifier"]: np.array(x["tenors"]) for x in self.metadata["yield_curves"]}
+
+    @property
+    def start_date(self) -> datetime:
+        return self.dates[0].astype("datetime64[us]").item()
+
+    @property
+    def end_date(self) -> datetime:
+        return self.dates[-1].astype("datetime64[us]").item()
+
+    def row(self, date: datetime) -> int:
+        offset = int((np.datetime64(date, "D") - self.dates[0]).astype(int))
+        if offset < 0:
+            raise ValueError(f"No market data on or before {date}!")
+        return int(self.date_rows[min(offset, len(self.date_rows) - 1)])
+
+    def economy(self, date: datetime) -> Economy:
+        row = self.row(date)
+        return Economy(
+            current_date=date,
+            yield_curves=self._yield_curves(row),
+            share_prices=self._share_prices(row),
+            exchange_rates=self._exchange_rates(row)
+        )
+
+    def _yield_curves(self, row: int) -> Dict[str, YieldCurve]:
+        # Yields are copied out of the memory map, as curves may be bumped in place.
+        yields = np.array(self.yield_curves[row])
+        return {
+            x["identifier"]: YieldCurve(identifier=x["identifier"], currency=x["currency"],
+                                        tenors=self.curve_tenors[x["identifier"]],
+                                        yields=yields[x["start"]:x["stop"]], date_helper=self.date_helper)
+            for x in self.metadata["yield_curves"]
+        }
+
+    def _share_prices(self, row: int) -> Dict[str, SharePrice]:
+        share_prices = self.share_prices[row]
+        return {
+            x["identifier"]: SharePrice(ticker_symbol=x["identifier"], currency=x["currency"], value=float(value))
+            for x, value in zip(self.metadata["share_prices"], share_prices)
+        }
+
+    def _exchange_rates(self, row: int) -> Dict[str, ExchangeRate]:
+        exchange_rates = self.exchange_rates[row]
+        return {
+            x["identifier"]: ExchangeRate(value=float(value), base_currency=x["base_currency"],
+                                          quote_currency=x["quote_currency"])
+            for x, value in zip(self.metadata["exchange_rates"], exchange_rates)
+        }
+
+    @classmethod
+    def build(cls, history_path: str, store_path: str, date_helper: DateHelper = DateHelper()) -> MarketDataStore:
+        import pandas as pd
+        # History files have the columns of the EconomyReader files preceded by a date column.
+        # Observations missing on a date are carried forward from the previous date.
+        curve_df = pd.read_csv(os.path.join(history_path, cls.yield_curve_csv), parse_dates=[0])
+        shr_df = pd.read_csv(os.path.join(history_path, cls.share_price_csv), parse_dates=[0])
+        fx_df = pd.read_csv(os.path.join(history_path, cls.exchange_rate_csv), parse_dates=[0])
+        dates = np.unique(np.concatenate([df.iloc[:, 0].values for df in [curve_df, shr_df, fx_df]]))
+        dates = np.unique(dates.astype("datetime64[D]"))
+        curve_table, curve_metadata = cls._curve_table(curve_df, dates, date_helper)
+        shr_table, shr_metadata = cls._observable_table(shr_df, dates, {"currency": 2}, 3)
+        fx_table, fx_metadata = cls._observable_table(fx_df, dates, {"base_currency": 2, "quote_currency": 3}, 4)
+        days = np.arange(dates[0], dates[-1] + 1)
+        date_rows = np.searchsorted(dates, days, side="right") - 1
+        os.makedirs(store_path, exist_ok=True)
+        arrays = {"dates": dates, "date_rows": date_rows, "yield_curves": curve_table, "share_prices": shr_table,
+                  "exchange_rates": fx_table}
+        for field in cls.fields:
+            np.save(os.path.join(store_path, f"{field}.npy"), arrays[field])
+        metadata = {"yield_curves": curve_metadata, "share_prices": shr_metadata, "exchange_rates": fx_metadata}
+        with open(os.path.join(store_path, cls.metadata_json), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+        return cls(store_path, date_helper)
+
+    @staticmethod
+    def _table(df: pd.DataFrame, dates: np.array, columns: List[str], value_idx: int) -> np.array:
+        import pandas as pd
+        # Dates (rows) x columns, carrying observations forward.
+        df = df.assign(Date=df.iloc[:, 0].values.astype("datetime64[D]"))
+        table = df.pivot_table(index="Date", columns=columns, values=df.columns[value_idx], aggfunc="last")
+        table = table.reindex(index=pd.DatetimeIndex(dates)).ffill()
+        return table
+
+    @classmethod
+    def _curve_table(cls, curve_df: pd.DataFrame, dates: np.array, date_helper: DateHelper) -> tuple:
+        identifier, currency, tenor = curve_df.columns[1:4]
+        table = cls._table(curve_df, dates, [identifier, tenor], 4)
+        columns, metadata = [], []
+        for curve_id in dict.fromkeys(curve_df[identifier]):
+            curve_tenors = list(dict.fromkeys(curve_df.loc[curve_df[identifier] == curve_id, tenor]))
+            curve_tenors.sort(key=date_helper.tenor_from_string)
+            metadata.append({
+                "identifier": curve_id,
+                "currency": curve_df.loc[curve_df[identifier] == curve_id, currency].iloc[0],
+                "tenors": [date_helper.tenor_from_string(x) for x in curve_tenors],
+                "start": len(columns),
+                "stop": len(columns) + len(curve_tenors)
+            })
+            columns += [(curve_id, x) for x in curve_tenors]
+        return table[columns].to_numpy(dtype=float), metadata
+
+    @classmethod
+    def _observable_table(cls, df: pd.DataFrame, dates: np.array, attributes: Dict[str, int], value_idx: int) -> tuple:
+        identifier = df.columns[1]
+        table = cls._table(df, dates, [identifier], value_idx)
+        metadata = []
+        for observable_id, observable_df in df.groupby(identifier, sort=False):
+            metadata.append({"identifier": observable_id,
+                             **{name: observable_df.iloc[0, idx] for name, idx in attributes.items()}})
+        return table[[x["identifier"] for x in metadata]].to_numpy(dtype=float), metadata
@@ -1,58 +1,111 @@
+from __future__ import annotations
+
 import os
-import pandas as pd
+from typing import TYPE_CHECKING
 
 from instruments.portfolio import Portfolio
 from instruments.factory import InstrumentFactory
+from readers.input_cache import InputCache
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class PortfolioReader:
 
-    def __init__(self):
+    def __init__(self, input_cache: InputCache = None):
+        self.input_cache = input_cache
         self.portfolio_csv = "portfolio.csv"
+        self.columns = ["Identifier", "Instrument Type", "Discount Curve Quote", "Discount Curve Base",
+                        "Forecast Curve Quote", "Forecast Curve Base", "Notional", "Start Date", "Maturity Date",
+                        "Quote Currency", "Base Currency", "Ticker Symbol"]
+        self.date_columns = ["Start Date", "Maturity Date"]
         self.instrument_factory = InstrumentFactory()
 
-    def read_portfolio(self, portfolio_path: str) -> Portfolio:
-        # Todo: Another very ugly reader...
-        instruments = []
-        portfolio_path = os.path.join(portfolio_path, self.portfolio_csv)
-        portfolio_df = pd.read_csv(portfolio_path)
-        for k in range(len(portfolio_df)):
-            identifier = portfolio_df.iloc[k, 0]
-            instrument_type = portfolio_df.iloc[k, 1]
-            discount_curve_quote = portfolio_df.iloc[k, 2]
-            discount_curve_base = portfolio_df.iloc[k, 3]
-            forecast_curve_quote = portfolio_df.iloc[k, 4]
-            forecast_curve_base = portfolio_df.iloc[k, 5]
-            notional = portfolio_df.iloc[k, 6]
-            start_date = pd.to_datetime(portfolio_df.iloc[k, 7])
-            maturity_date = pd.to_datetime(portfolio_df.iloc[k, 8])
-            quote_currency = portfolio_df.iloc[k, 9]
-            base_currency = portfolio_df.iloc[k, 10]
-            ticker_symbol = portfolio_df.iloc[k, 11]
-            kwargs = {}
-            if not pd.isnull(discount_curve_quote):
-                if not pd.isnull(discount_curve_base):
-                    kwargs['discount_curve_quote_id'] = discount_curve_quote
-                    kwargs['discount_curve_base_id'] = discount_curve_base
-                else:
-                    kwargs['discount_curve_id'] = discount_curve_quote
-            if not pd.isnull(forecast_curve_quote):
-                if not pd.isnull(forecast_curve_base):
-                    kwargs['forecast_curve_quote_id'] = forecast_curve_quote
-                    kwargs['forecast_curve_base_id'] = forecast_curve_base
-                else:
-                    kwargs['forecast_curve_id'] = forecast_curve_quote
-            if not pd.isnull(notional):
-                kwargs['notional'] = notional
-            if not pd.isnull(start_date):
-                kwargs['start_date'] = start_date
-            if not pd.isnull(maturity_date):
-                kwargs['maturity_date'] = maturity_date
-            kwargs['quote_currency'] = quote_currency
-            if not pd.isnull(base_currency):
-                kwargs['base_currency'] = base_currency
-            if not pd.isnull(ticker_symbol):
-                kwargs['ticker_symbol'] = ticker_symbol
-            instrument = self.instrument_factory.create_instrument(instrument_type, **kwargs)
-            instruments.append(instrument)
-        return Portfolio(instruments)
+    def read_portfolio(self, portfolio_path: str, netting: bool = False) -> Portfolio:
+        if self.input_cache is None:
+            return self._read_portfolio(portfolio_path, netting)
+        csv_path = os.path.join(portfolio_path, self.portfolio_csv)
+        return self.input_cache.get("portfolio", [csv_path], lambda: self._read_portfolio(portfolio_path, netting),
+                                    options=(netting,))
+
+    def _read_portfolio(self, portfolio_path: str, netting: bool) -> Portfolio:
+        return self.read_portfolio_file(os.path.join(portfolio_path, self.portfolio_csv), netting)
+
+    def read_portfolio_file(self, file_path: str, netting: bool = False, chunk_size: int = 100_000) -> Portfolio:
+        # Reads a .csv or .parquet file in chunks of rows, such that only one chunk is held as a data frame.
+        # Without netting, the book columns are built per chunk, which bounds the intermediate cash flow
+        # schedules to one chunk. Instrument objects are still created for every row and kept by the portfolio.
+        portfolio = Portfolio(netting=netting)
+        for portfolio_df in self._read_chunks(file_path, chunk_size):
+            for instrument in self._create_instruments(portfolio_df):
+                portfolio.add_instrument(instrument)
+            if not netting:
+                # With netting, later rows may merge into any position, which is cheap as long as it is pending.
+                portfolio.book.flush()
+        return portfolio
+
+    def _read_chunks(self, file_path: str, chunk_size: int):
+        import pandas as pd
+        if file_path.endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(f"Reading {file_path} requires pyarrow!")
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+                yield self._prepare_chunk(batch.to_pandas())
+        else:
+            for portfolio_df in pd.read_csv(file_path, chunksize=chunk_size):
+                yield self._prepare_chunk(portfolio_df)
+
+    def _prepare_chunk(self, portfolio_df: pd.DataFrame) -> pd.DataFrame:
+        import pandas as pd
+        # Columns are taken by position (the header may carry a byte order mark) and dates are parsed per column.
+        portfolio_df = portfolio_df.iloc[:, :len(self.columns)].set_axis(self.columns, axis=1)
+        for column in self.date_columns:
+            portfolio_df[column] = pd.to_datetime(portfolio_df[column])
+        return portfolio_df
+
+    def _create_instruments(self, portfolio_df: pd.DataFrame) -> list:
+        import pandas as pd
+        # Rows of the same instrument type and the same missing columns share the keyword arguments,
+        # such that instruments are created per group from plain column lists. Row order is preserved.
+        instruments = [None] * len(portfolio_df)
+        present = portfolio_df.notnull()
+        pattern_columns = [column for column in self.columns[2:] if column != "Quote Currency"]
+        group_keys = [portfolio_df["Instrument Type"]] + [present[column] for column in pattern_columns]
+        rows = pd.Series(range(len(portfolio_df)), index=portfolio_df.index)
+        for key, group_rows in rows.groupby(group_keys, sort=False, dropna=False):
+            instrument_type, pattern = key[0], dict(zip(pattern_columns, key[1:]))
+            kwarg_columns = self._kwarg_columns(pattern)
+            group_df = portfolio_df.iloc[group_rows.values]
+            values = zip(*[group_df[column].tolist() for column in kwarg_columns.values()])
+            for row, row_values in zip(group_rows.values, values):
+                kwargs = dict(zip(kwarg_columns, row_values))
+                instruments[row] = self.instrument_factory.create_instrument(instrument_type, **kwargs)
+        return instruments
+
+    @staticmethod
+    def _kwarg_columns(present: dict) -> dict:
+        # Keyword argument name per column for rows with the given present (non-missing) columns.
+        kwarg_columns = {}
+        if present["Discount Curve Quote"]:
+            if present["Discount Curve Base"]:
+                kwarg_columns["discount_curve_quote_id"] = "Discount Curve Quote"
+                kwarg_columns["discount_curve_base_id"] = "Discount Curve Base"
+            else:
+                kwarg_columns["discount_curve_id"] = "Discount Curve Quote"
+        if present["Forecast Curve Quote"]:
+            if present["Forecast Curve Base"]:
+                kwarg_columns["forecast_curve_quote_id"] = "Forecast Curve Quote"
+                kwarg_columns["forecast_curve_base_id"] = "Forecast Curve Base"
+            else:
+                kwarg_columns["forecast_curve_id"] = "Forecast Curve Quote"
+        optional_columns = {"notional": "Notional", "start_date": "Start Date", "maturity_date": "Maturity Date"}
+        kwarg_columns.update({name: column for name, column in optional_columns.items() if present[column]})
+        kwarg_columns["quote_currency"] = "Quote Currency"
+        if present["Base Currency"]:
+            kwarg_columns["base_currency"] = "Base Currency"
+        if present["Ticker Symbol"]:
+            kwarg_columns["ticker_symbol"] = "Ticker Symbol"
+        return kwarg_columns
@@ -0,0 +1,85 @@
+"""
+This module contains a historical simulation of the profit and loss of a portfolio,
+revaluing the portfolio under market shocks in chunks of scenarios.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from typing import List
+
+from economy.base import Economy
+from economy.scenarios import MarketShocks
+from instruments.portfolio import Portfolio
+
+
+class HistoricalSimulation:
+
+    def __init__(self, portfolio: Portfolio, economy: Economy, reporting_currency: str = None,
+                 chunk_size: int = 250) -> None:
+        # Without a reporting currency, values in different currencies are summed as is (like Portfolio.value).
+        self.portfolio = portfolio
+        self.economy = economy
+        self.reporting_currency = reporting_currency
+        # Memory is bounded by the cash flows of the portfolio times the number of scenarios per chunk.
+        self.chunk_size = chunk_size
+
+    def profit_and_loss(self, market_shocks: MarketShocks) -> np.array:
+        base_value = self.value(self.economy)
+        pnl = np.zeros(market_shocks.n_scenarios)
+        for start in range(0, market_shocks.n_scenarios, self.chunk_size):
+            stop = min(start + self.chunk_size, market_shocks.n_scenarios)
+            scenario_economy = market_shocks.chunk(start, stop).apply(self.economy)
+            pnl[start:stop] = self.value(scenario_economy) - base_value
+        return pnl
+
+    def value(self, economy: Economy) -> np.array:
+        instrument_values = self.portfolio.instrument_values(economy)
+        if self.reporting_currency is not None:
+            currencies = [instrument.quote_currency for instrument in self.portfolio.instruments]
+            instrument_values = instrument_values * self._conversion_rates(economy, currencies)
+        return np.sum(instrument_values, axis=-1)
+
+    def _conversion_rates(self, economy: Economy, currencies: List[str]) -> np.array:
+        # Units of the reporting currency per unit of each currency, with the scenario axes of the economy.
+        rates = {}
+        for currency in dict.fromkeys(currencies):
+            direct, inverse = f"{currency}_{self.reporting_currency}", f"{self.reporting_currency}_{currency}"
+            if currency == self.reporting_currency:
+                rates[currency] = 1.0
+            elif direct in economy.exchange_rates:
+                rates[currency] = economy.exchange_rates[direct].value
+            elif inverse in economy.exchange_rates:
+                rates[currency] = 1.0 / economy.exchange_rates[inverse].value
+            else:
+                raise ValueError(f"No exchange rate from {currency} to {self.reporting_currency}!")
+        conversion_rates = np.broadcast_arrays(*[rates[currency] for currency in currencies])
+        return np.stack(conversion_rates, axis=-1) if conversion_rates else np.zeros(0)
+
+    def report(self, market_shocks: MarketShocks, confidence: float = 0.99) -> RiskReport:
+        return RiskReport(self.profit_and_loss(market_shocks), confidence)
+
+
+class RiskReport:
+    """
+    Value at risk and expected shortfall of a profit and loss distribution, reported as positive losses.
+    """
+
+    def __init__(self, pnl: np.array, confidence: float = 0.99) -> None:
+        self.pnl = pnl
+        self.confidence = confidence
+        self.value_at_risk = value_at_risk(pnl, confidence)
+        self.expected_shortfall = expected_shortfall(pnl, confidence)
+
+    def __repr__(self) -> str:
+        return f"RiskReport(scenarios={len(self.pnl)}, confidence={self.confidence}, " \
+               f"value_at_risk={self.value_at_risk:.2f}, expected_shortfall={self.expected_shortfall:.2f})"
+
+
+def value_at_risk(pnl: np.array, confidence: float = 0.99) -> float:
+    return float(-np.quantile(pnl, 1.0 - confidence))
+
+
+def expected_shortfall(pnl: np.array, confidence: float = 0.99) -> float:
+    # Average loss in the scenarios at or beyond the value at risk.
+    return float(-np.mean(pnl[pnl <= -value_at_risk(pnl, confidence)]))
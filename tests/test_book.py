@@ -0,0 +1,113 @@
+import os
+import unittest
+import numpy as np
+from datetime import datetime
+from dateutil.relativedelta import relativedelta
+
+from economy.observables.interest_rate import InterestRate
+from economy.term_structures.yield_curve_set import YieldCurveSet
+from exposures.base import BucketedZeroDelta
+from instruments.book import PortfolioBook
+from instruments.cash.debt import FixedRateBond, FloatingRateBond, ZeroCouponBond
+from instruments.cash.equity import Stock
+from instruments.derivatives.swaps import InterestRateSwap, SwapType
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+CURVE_ID = "EUR_EURIBOR_3M"
+
+
+class TestPortfolioBook(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.economy = EconomyReader().read_economy(datetime(2021, 11, 15), os.path.join(INPUT_DIR, 'economy'))
+        self.instruments = self.build_instruments()
+
+    def build_instruments(self) -> list:
+        # New and seasoned instruments of every book segment, including schedules rolled from month ends.
+        fixed_rate = InterestRate(identifier="FIX", currency="EUR", value=0.015)
+        instruments = [
+            Stock("EUR", "SX5E", 100.0),
+            Stock("USD", "SPX", -50.0),
+            ZeroCouponBond("EUR", CURVE_ID, 1e6, datetime(2021, 11, 15), datetime(2031, 11, 15)),
+            ZeroCouponBond("USD", "USD_LIBOR_3M", -5e5, datetime(2019, 6, 30), datetime(2024, 6, 30)),
+            FixedRateBond("EUR", CURVE_ID, 1e6, datetime(2021, 11, 15), datetime(2036, 11, 15), "6M", fixed_rate),
+            FixedRateBond("EUR", CURVE_ID, 2e6, datetime(2021, 1, 31), datetime(2031, 8, 31), "1M", fixed_rate),
+            FixedRateBond("GBP", "GBP_LIBOR_3M", 3e5, datetime(2020, 2, 29), datetime(2028, 2, 29), "1Y", fixed_rate),
+            FloatingRateBond("EUR", CURVE_ID, CURVE_ID, 1e6, datetime(2021, 11, 15), datetime(2031, 11, 15), "3M"),
+            FloatingRateBond("EUR", "EUR_EONIA_1D", CURVE_ID, -1e6, datetime(2021, 5, 31), datetime(2029, 11, 30), "3M"),
+        ]
+        for swap_type, start_date in [(SwapType.Payer, datetime(2021, 11, 15)), (SwapType.Receiver, datetime(2021, 3, 31))]:
+            instruments.append(InterestRateSwap(
+                quote_currency="EUR", discount_curve_id=CURVE_ID, forecast_curve_id=CURVE_ID, notional=1e6,
+                start_date=start_date, maturity_date=start_date + relativedelta(years=10),
+                underlying=InterestRate(identifier=CURVE_ID, currency="EUR", value=0.0), payment_freq_fixed="1Y",
+                payment_freq_float="3M", swap_type=swap_type.value, economy=self.economy
+            ))
+        return instruments
+
+    def test_instrument_values(self):
+        values = PortfolioBook(self.instruments).instrument_values(self.economy)
+        for instrument, value in zip(self.instruments, values):
+            self.assertTrue(np.isclose(value, instrument.value_from_economy(self.economy), rtol=1e-10, atol=1e-6),
+                            f"{instrument} valued at {value} in the book")
+
+    def test_value(self):
+        # Cash flow segments are valued through the cash flow ladder, all others per instrument.
+        expected = sum(instrument.value_from_economy(self.economy) for instrument in self.instruments)
+        self.assertAlmostEqual(PortfolioBook(self.instruments).value(self.economy), expected, delta=1e-6)
+
+    def test_month_end_schedules(self):
+        # Payment dates are rolled back from the maturity date and clipped to the month end.
+        bond = self.instruments[5]
+        expected = [bond.maturity_date - relativedelta(months=k) for k in range(len(bond.date_schedule.payment_dates))]
+        expected = np.array(expected[::-1], dtype="datetime64[us]")
+        self.assertTrue((bond.date_schedule.payment_dates == expected).all())
+        self.assertIn(np.datetime64(datetime(2024, 2, 29), "us"), bond.date_schedule.payment_dates)
+
+    def test_notional_updates(self):
+        # The book is valued first, such that the notional is updated in the columns rather than pending rows.
+        book = PortfolioBook(self.instruments)
+        book.instrument_values(self.economy)
+        bond = self.instruments[4]
+        bond_copy = FixedRateBond("EUR", CURVE_ID, 3e6, bond.start_date, bond.maturity_date, "6M", bond.fixed_rate)
+        book.update_notional(4, bond_copy)
+        self.assertTrue(np.isclose(book.instrument_values(self.economy)[4], bond_copy.value_from_economy(self.economy)))
+
+    def test_scenario_values(self):
+        n_scenarios = 3
+        rng = np.random.default_rng(0)
+        shifts = {curve_id: rng.normal(0.0, 0.001, (n_scenarios, len(yield_curve.tenors)))
+                  for curve_id, yield_curve in self.economy.yield_curves.items()}
+        economy_set = self.economy.overlay(yield_curves={
+            curve_id: YieldCurveSet.from_shifts(self.economy.yield_curves[curve_id], curve_shifts)
+            for curve_id, curve_shifts in shifts.items()
+        })
+        values = PortfolioBook(self.instruments).instrument_values(economy_set)
+        self.assertEqual(values.shape, (n_scenarios, len(self.instruments)))
+        for k in range(n_scenarios):
+            economy = self.economy.overlay(yield_curves={
+                curve_id: self.economy.yield_curves[curve_id].shifted(curve_shifts[k])
+                for curve_id, curve_shifts in shifts.items()
+            })
+            expected = [instrument.value_from_economy(economy) for instrument in self.instruments]
+            self.assertTrue(np.allclose(values[k], expected, rtol=1e-10, atol=1e-6))
+
+    def test_bucketed_zero_delta(self):
+        # Central differences of the per instrument values, rounding errors of the values are well below 1.0.
+        bump_size = 0.0001
+        yield_curve = self.economy.yield_curves[CURVE_ID]
+        exposure = BucketedZeroDelta("EUR 3M", CURVE_ID, list(yield_curve.tenors), bump_size)
+        deltas = exposure.portfolio_exposure(Portfolio(self.instruments), self.economy)
+        for idx in range(len(yield_curve.tenors)):
+            economy_up = self.economy.overlay(yield_curves={CURVE_ID: yield_curve.bumped_idx(idx, bump_size)})
+            economy_down = self.economy.overlay(yield_curves={CURVE_ID: yield_curve.bumped_idx(idx, -bump_size)})
+            value_up = sum(instrument.value_from_economy(economy_up) for instrument in self.instruments)
+            value_down = sum(instrument.value_from_economy(economy_down) for instrument in self.instruments)
+            expected = (value_up - value_down) / (2.0 * bump_size)
+            self.assertTrue(np.isclose(deltas[idx], expected, rtol=1e-6, atol=1.0), f"Node {idx}: {deltas[idx]}")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import copy
+import pickle
+import unittest
+from datetime import datetime, timedelta
+
+from instruments.factory import InstrumentFactory
+from utils.dates import DateScheduleGenerator, DateScheduleCache, SCHEDULE_CACHE
+
+
+class TestDateScheduleGenerator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.bond = InstrumentFactory().create_instrument(
+            "ZeroCouponBond", quote_currency="EUR", discount_curve_id="EUR_EONIA_1D", notional=10_000,
+            start_date=datetime(2020, 1, 1), maturity_date=datetime(2030, 1, 1)
+        )
+
+    def populate_cache(self, n_schedules: int = 3_000) -> None:
+        generator = DateScheduleGenerator("1M")
+        start_date = datetime(2020, 1, 1)
+        for k in range(n_schedules):
+            generator.date_schedule(start_date + timedelta(days=k), datetime(2040, 1, 1))
+
+    def test_pickle_does_not_copy_schedule_cache(self):
+        size = len(pickle.dumps(self.bond))
+        self.populate_cache()
+        self.assertGreaterEqual(len(SCHEDULE_CACHE.schedules), 3_000)
+        self.assertLess(len(pickle.dumps(self.bond)), 2 * size)
+
+    def test_copies_share_schedule_cache(self):
+        self.populate_cache(10)
+        for bond in [pickle.loads(pickle.dumps(self.bond)), copy.deepcopy(self.bond)]:
+            self.assertIs(bond.schedule_generator.schedule_cache, SCHEDULE_CACHE)
+            self.assertTrue((bond.date_schedule.payment_dates == self.bond.date_schedule.payment_dates).all())
+
+    def test_custom_cache_is_copied(self):
+        cache = DateScheduleCache()
+        generator = DateScheduleGenerator("3M", schedule_cache=cache)
+        generator.date_schedule(datetime(2020, 1, 31), datetime(2025, 1, 31))
+        generator_copy = copy.deepcopy(generator)
+        self.assertIsNot(generator_copy.schedule_cache, SCHEDULE_CACHE)
+        self.assertEqual(len(generator_copy.schedule_cache.schedules), 1)
+
+    def tearDown(self) -> None:
+        SCHEDULE_CACHE.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import tempfile
+import unittest
+
+from readers.input_cache import InputCache
+
+
+class TestInputCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.tmp_dir.name, "input.csv")
+        with open(self.input_path, "w") as input_file:
+            input_file.write("a,b\n1,2\n")
+        self.cache = InputCache(os.path.join(self.tmp_dir.name, "cache"))
+        self.builds = 0
+
+    def build(self) -> dict:
+        self.builds += 1
+        return {"value": self.builds}
+
+    def test_hit_after_build(self):
+        self.assertEqual(self.cache.get("input", [self.input_path], self.build), {"value": 1})
+        self.assertEqual(self.cache.get("input", [self.input_path], self.build), {"value": 1})
+        self.assertEqual(self.builds, 1)
+
+    def test_source_change_invalidates_entries(self):
+        self.cache.get("input", [self.input_path], self.build)
+        source_hash = InputCache._source_hash
+        try:
+            InputCache._source_hash = "changed sources"
+            self.assertEqual(self.cache.get("input", [self.input_path], self.build), {"value": 2})
+        finally:
+            InputCache._source_hash = source_hash
+
+    def tearDown(self) -> None:
+        self.tmp_dir.cleanup()
+
+
+if __name__ == "__main__":
+    unittest.main()
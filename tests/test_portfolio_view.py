@@ -0,0 +1,52 @@
+import os
+import unittest
+import numpy as np
+from datetime import datetime
+
+from instruments.base import InstrumentLevel2
+from instruments.portfolio import Portfolio
+from readers.economy_reader import EconomyReader
+from readers.mandate_reader import MandateReader
+from readers.portfolio_reader import PortfolioReader
+
+INPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'io', 'input')
+
+
+class TestPortfolioView(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.economy = EconomyReader().read_economy(datetime.now(), os.path.join(INPUT_DIR, 'economy'))
+        self.mandate = MandateReader().read_mandate(os.path.join(INPUT_DIR, 'mandate'))
+        self.portfolio = PortfolioReader().read_portfolio(os.path.join(INPUT_DIR, 'portfolio'))
+
+    def test_mandate_on_filtered_view(self):
+        for level_2s in [[InstrumentLevel2.Debt], [InstrumentLevel2.Equity], list(InstrumentLevel2)]:
+            view = self.portfolio.filter_on_level_2(level_2s)
+            expected = self.mandate.portfolio_exposures(Portfolio(view.instruments), self.economy)
+            exposures = self.mandate.portfolio_exposures(view, self.economy)
+            self.assertTrue(np.allclose(exposures, expected))
+
+    def test_view_follows_portfolio_revision(self):
+        view = self.portfolio.filter_on_level_2([InstrumentLevel2.Debt])
+        self.assertEqual(view.revision, self.portfolio.revision)
+        self.portfolio.add_instrument(self.portfolio.instruments[0])
+        self.assertEqual(view.revision, self.portfolio.revision)
+
+    def test_filters_compose(self):
+        debt = [instrument for instrument in self.portfolio.instruments if instrument.instrument_level_2 == InstrumentLevel2.Debt]
+        currency = debt[0].quote_currency
+        view = self.portfolio.filter_on_level_2([InstrumentLevel2.Debt]).filter_on_currency([currency])
+        expected = [
+            position for position, instrument in enumerate(self.portfolio.instruments)
+            if instrument.instrument_level_2 == InstrumentLevel2.Debt and instrument.quote_currency == currency
+        ]
+        self.assertEqual(list(view.positions), expected)
+        self.assertAlmostEqual(view.value(self.economy), Portfolio(view.instruments).value(self.economy))
+
+        # Instruments added later are picked up by the composed view.
+        self.portfolio.add_instrument(self.portfolio.instruments[expected[0]])
+        self.assertEqual(len(view), len(expected) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+
+from ppo.returns import discounted_returns, generalized_advantages
+
+
+class TestReturns(unittest.TestCase):
+
+    def setUp(self) -> None:
+        # A terminated episode of three steps followed by an episode truncated after two steps.
+        self.rews = np.array([1.0, 2.0, 3.0, 4.0, 5.0])
+        self.lens = [3, 2]
+        self.gamma = 0.9
+        self.bootstrap_values = np.array([0.0, 10.0])
+
+    def test_discounted_returns(self):
+        returns = discounted_returns(self.rews, self.lens, self.gamma)
+        expected = [1.0 + 0.9 * 2.0 + 0.81 * 3.0, 2.0 + 0.9 * 3.0, 3.0, 4.0 + 0.9 * 5.0, 5.0]
+        self.assertTrue(np.allclose(returns, expected))
+
+    def test_truncated_episode_is_bootstrapped(self):
+        returns = discounted_returns(self.rews, self.lens, self.gamma, self.bootstrap_values)
+        expected = [1.0 + 0.9 * 2.0 + 0.81 * 3.0, 2.0 + 0.9 * 3.0, 3.0, 4.0 + 0.9 * 5.0 + 0.81 * 10.0, 5.0 + 0.9 * 10.0]
+        self.assertTrue(np.allclose(returns, expected))
+
+    def test_generalized_advantages(self):
+        values = np.array([0.5, -1.0, 2.0, 1.0, 3.0])
+        # With lambda = 1 the lambda-returns are the bootstrapped returns.
+        advantages, returns = generalized_advantages(self.rews, values, self.bootstrap_values, self.lens, self.gamma, 1.0)
+        self.assertTrue(np.allclose(returns, discounted_returns(self.rews, self.lens, self.gamma, self.bootstrap_values)))
+        self.assertTrue(np.allclose(advantages, returns - values))
+        # With lambda = 0 the advantages are the one step temporal difference errors.
+        advantages, _ = generalized_advantages(self.rews, values, self.bootstrap_values, self.lens, self.gamma, 0.0)
+        next_values = np.array([-1.0, 2.0, 0.0, 3.0, 10.0])
+        self.assertTrue(np.allclose(advantages, self.rews + self.gamma * next_values - values))
+
+
+if __name__ == "__main__":
+    unittest.main()
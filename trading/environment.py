@@ -1,39 +1,64 @@
 import numpy as np
-import matplotlib.pyplot as plt
 from gym import Env, spaces
 from gym.utils import seeding
 from copy import deepcopy
 
 from mandate.base import Mandate
+from mandate.tracker import ExposureTracker
 from economy.base import Economy
+from economy.simulation import ScenarioBank
 from instruments.portfolio import Portfolio
 
 
 class TradingEnvironment(Env):
 
-    def __init__(self, mandate: Mandate, economy: Economy, portfolio: Portfolio) -> None:
+    def __init__(self, mandate: Mandate, economy: Economy, portfolio: Portfolio, linearized: bool = False,
+                 scenario_bank: ScenarioBank = None) -> None:
         super().__init__()
         self.mandate = mandate
         self.economy = economy
         self.portfolio = portfolio
+        # With a scenario bank, every episode follows a sampled path and the economy moves one step per step.
+        if linearized and scenario_bank is not None:
+            raise ValueError("Linearized mode requires a static economy, it can not use a scenario bank!")
+        self.scenario_bank = scenario_bank
+        self.scenario_path = None
+        self.scenario_rng = np.random.default_rng()
+        # In linearized mode trades update the exposures through a precomputed exposure per unit matrix,
+        # no instruments are created and the portfolio is left untouched. Traded notionals are accumulated.
+        self.linearized = linearized
+        self.exposure_per_unit = None
+        self.exposure_per_unit_economy = None
+        self.traded_notionals = np.zeros(mandate.n_instruments)
         self.digits = 2
         self.action_space = self._get_action_space()
         self.observation_space = self._get_observation_space()
         # Used to reset environment.
         self.init_economy = deepcopy(economy)
         self.init_portfolio = deepcopy(portfolio)
-        self.init_exposure_deviations = mandate.exposure_deviations(portfolio, economy, as_array=True)
+        self.exposure_tracker = ExposureTracker(mandate, portfolio, economy)
+        self.init_exposures = self.exposure_tracker.exposures.copy()
+        self.init_exposure_deviations = self.exposure_tracker.exposure_deviations()
         # Trades happen in notional amounts.
         self.old_state = deepcopy(self.init_exposure_deviations)
         self.state = deepcopy(self.init_exposure_deviations)
-        self.exposure_ids = [x.identifier for x in self.mandate.exposures]
+        self.exposure_ids = self.mandate.exposure_labels
         self.steps = 0
         self.max_steps = 10
+        if self.linearized:
+            self._update_exposure_per_unit()
 
     def step(self, action: np.array) -> tuple:
         self.steps += 1
-        self._trade_instruments(action)
-        self._update_state()
+        if self.linearized:
+            self._update_state_linearized(action)
+        else:
+            instruments = self._trade_instruments(action)
+            if self.scenario_bank is not None:
+                # The market moves after the trades, so the new state values them in the next economy.
+                step = min(self.steps, self.scenario_bank.n_steps)
+                self.economy = self.scenario_bank.economy(self.scenario_path, step)
+            self._update_state(instruments)
         reward, done = self._compute_reward()
         self.old_state = deepcopy(self.state)
         return self.state, reward, done, {}
@@ -44,32 +69,63 @@ class TradingEnvironment(Env):
             done = True
         return reward, done
 
-    def _trade_instruments(self, action: np.array) -> None:
+    def _trade_instruments(self, action: np.array) -> list:
+        instruments = []
         for k in range(self.mandate.n_instruments):
             instrument = self.mandate.instrument_generators[k](action[k], self.economy)
             self.portfolio.add_instrument(instrument)
+            instruments.append(instrument)
+        return instruments
 
     def render(self, mode="human"):
+        # Matplotlib is imported on use, rollout workers never render.
+        import matplotlib.pyplot as plt
         plt.clf()
         plt.title("Mandate Exposures")
-        exposures, targets = self.mandate.portfolio_exposures(self.portfolio, self.economy), self.mandate.targets
+        exposures, targets = self.exposure_tracker.exposures, self.mandate.target_array
         plt.grid()
         plt.barh(self.exposure_ids, width=exposures)
         plt.barh(self.exposure_ids, width=targets, alpha=0.50)
         plt.tight_layout()
         plt.pause(0.00001)
 
-    def _update_state(self) -> None:
-        self.state = self.mandate.exposure_deviations(self.portfolio, self.economy, as_array=True)
+    def _update_state(self, instruments: list) -> None:
+        # Only the new trades are valued, unless the economy has changed since the last update.
+        self.exposure_tracker.add_instruments(instruments, self.portfolio, self.economy)
+        self.state = self.exposure_tracker.exposure_deviations()
+
+    def _update_state_linearized(self, action: np.array) -> None:
+        action = np.asarray(action, dtype=float)
+        self.traded_notionals += action
+        self.exposure_tracker.add_exposures(self.exposure_per_unit @ action)
+        self.state = self.exposure_tracker.exposure_deviations()
+
+    def _update_exposure_per_unit(self) -> None:
+        # The economy is static within an episode, so the matrix only changes with the economy.
+        if self.exposure_per_unit_economy is not self.economy:
+            self.exposure_per_unit = self.mandate.exposures_per_unit(self.economy)
+            self.exposure_per_unit_economy = self.economy
 
     def seed(self, seed=None):
         self.np_random, seed = seeding.np_random(seed)
+        self.scenario_rng = np.random.default_rng(seed)
         return [seed]
 
     def reset(self):
-        self.economy = deepcopy(self.init_economy)
-        self.portfolio = deepcopy(self.init_portfolio)
-        self.state = deepcopy(self.init_exposure_deviations)
+        # The economy is never modified within an episode (scenarios are overlays) and can be shared.
+        self.economy = self.init_economy
+        self.portfolio = self.init_portfolio.copy()
+        self.traded_notionals = np.zeros(self.mandate.n_instruments)
+        if self.scenario_bank is not None:
+            self.scenario_path = self.scenario_bank.sample_path(self.scenario_rng)
+            self.economy = self.scenario_bank.economy(self.scenario_path, 0)
+            self.exposure_tracker.recompute(self.portfolio, self.economy)
+            self.state = self.exposure_tracker.exposure_deviations()
+        else:
+            self.exposure_tracker.reset(self.economy, self.init_exposures)
+            self.state = deepcopy(self.init_exposure_deviations)
+        if self.linearized:
+            self._update_exposure_per_unit()
         self.old_state = deepcopy(self.state)
         self.steps = 0
         return self.state
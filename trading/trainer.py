@@ -1,3 +1,5 @@
+from typing import Callable
+
 from ppo.optimizer import ProximalPolicyOptimization
 from ppo.networks import ActorNN
 from trading.environment import TradingEnvironment
@@ -8,22 +10,30 @@ class TrainingConfig:
     def __init__(self) -> None:
         self.total_timesteps = 1_000_000
         self.actors = 4
+        self.envs_per_actor = 1
         self.steps_per_rollout = 600
         self.steps_per_episode = 1000
         self.updates_per_iteration = 40
         self.gamma = 0.99
+        # Advantages from rewards-to-go ("rtg") or generalized advantage estimation ("gae"), both bootstrapped.
+        self.advantage_estimator = "rtg"
+        self.gae_lambda = 0.95
         self.lr_actor = 0.0003
         self.lr_critic = 0.0003
         self.action_std_start = 0.60
         self.action_std_end = 0.10
         self.clip = 0.2
+        self.seed = None
+        # Rollout workers trace the actor with TorchScript to cut the per-step Python overhead.
+        self.jit_actor = False
 
 
 class PolicyTrainer:
 
-    def __init__(self, env: TradingEnvironment, config: TrainingConfig = TrainingConfig()) -> None:
+    def __init__(self, env: TradingEnvironment, config: TrainingConfig = TrainingConfig(), env_fn: Callable[[], TradingEnvironment] = None) -> None:
         self.env = env
         self.config = config
+        self.env_fn = env_fn
         self.model = self._get_ppo_model()
 
     def learn_policy(self) -> ActorNN:
@@ -38,4 +48,4 @@ class PolicyTrainer:
         return policy
 
     def _get_ppo_model(self):
-        return ProximalPolicyOptimization(env=self.env, config=self.config)
+        return ProximalPolicyOptimization(env=self.env, config=self.config, env_fn=self.env_fn)
@@ -1,6 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
+from collections import defaultdict
 from datetime import datetime
+from typing import Dict
 
 from economy.term_structures.yield_curve import YieldCurve
 
@@ -8,15 +9,17 @@ from economy.term_structures.yield_curve import YieldCurve
 class CashFlowSchedule:
 
     def __init__(self, payment_dates: np.array, cash_flows: np.array) -> None:
-        assert len(payment_dates) == len(cash_flows)
+        # Cash flows may have a leading scenario axis, see YieldCurveSet.
+        assert len(payment_dates) == np.shape(cash_flows)[-1]
         self.payment_dates = payment_dates
         self.cash_flows = cash_flows
 
     def present_value(self, current_date: datetime, discount_curve: YieldCurve) -> float:
         discount_factors = discount_curve.discount_factor_strip(current_date, self.payment_dates)
-        return np.inner(self.cash_flows, discount_factors)
+        return np.sum(self.cash_flows * discount_factors, axis=-1)
 
     def plot(self):
+        import matplotlib.pyplot as plt
         # 1. Get masks for positive / negative bars.
         mask_positive = self.cash_flows >= 0
         mask_negative = self.cash_flows < 0
@@ -29,3 +32,47 @@ class CashFlowSchedule:
         plt.grid()
         plt.tight_layout()
         plt.show()
+
+
+class CashFlowLadder:
+    """
+    Projected cash flows of a portfolio aggregated per discount curve onto a single sorted date grid,
+    such that each curve is evaluated only once for all instruments discounted on it.
+    """
+
+    def __init__(self, current_date: datetime) -> None:
+        self.current_date = current_date
+        self.currencies: Dict[str, str] = {}
+        self.schedules: Dict[str, CashFlowSchedule] = {}
+        self.discount_factors: Dict[str, np.array] = {}
+
+    def add_cash_flows(self, discount_curve: YieldCurve, payment_dates: np.array, cash_flows: np.array) -> None:
+        curve_id = discount_curve.identifier
+        if curve_id in self.schedules:
+            payment_dates = np.concatenate([self.schedules[curve_id].payment_dates, payment_dates])
+            cash_flows = np.concatenate([self.schedules[curve_id].cash_flows, cash_flows])
+        date_grid, date_idx = np.unique(payment_dates, return_inverse=True)
+        cash_flows = np.bincount(date_idx.ravel(), weights=cash_flows, minlength=len(date_grid))
+        self.currencies[curve_id] = discount_curve.currency
+        self.schedules[curve_id] = CashFlowSchedule(date_grid, cash_flows)
+        self.discount_factors[curve_id] = discount_curve.discount_factor_strip(self.current_date, date_grid)
+
+    def present_values(self) -> Dict[str, float]:
+        return {curve_id: float(np.inner(schedule.cash_flows, self.discount_factors[curve_id]))
+                for curve_id, schedule in self.schedules.items()}
+
+    def present_value(self) -> float:
+        return sum(self.present_values().values())
+
+    def liquidity(self) -> Dict[str, CashFlowSchedule]:
+        # Undiscounted cash flows per currency, summed over all discount curves in that currency.
+        payment_dates, cash_flows = defaultdict(list), defaultdict(list)
+        for curve_id, schedule in self.schedules.items():
+            payment_dates[self.currencies[curve_id]].append(schedule.payment_dates)
+            cash_flows[self.currencies[curve_id]].append(schedule.cash_flows)
+        liquidity = {}
+        for currency in payment_dates:
+            date_grid, date_idx = np.unique(np.concatenate(payment_dates[currency]), return_inverse=True)
+            amounts = np.bincount(date_idx.ravel(), weights=np.concatenate(cash_flows[currency]), minlength=len(date_grid))
+            liquidity[currency] = CashFlowSchedule(date_grid, amounts)
+        return liquidity
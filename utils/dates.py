@@ -4,22 +4,79 @@ import numpy as np
 from datetime import datetime
 from dateutil.relativedelta import relativedelta
 
+EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
 
 class DateSchedule:
+    """
+    Payment dates are stored as a sorted datetime64 array. Schedules are shared between instruments
+    through the DateScheduleCache, hence their arrays are read-only and clipping returns views.
+    """
 
     def __init__(self, start_date: datetime, payment_dates: np.array, year_fractions: np.array) -> None:
         self.start_date = start_date
-        self.payment_dates = payment_dates
-        self.year_fractions = year_fractions
+        self.payment_dates = self._read_only(np.asarray(payment_dates, dtype="datetime64[us]"))
+        self.year_fractions = self._read_only(np.asarray(year_fractions, dtype=float))
 
     def clip_payment_dates(self, current_date: datetime) -> DateSchedule:
-        mask = self.payment_dates > current_date
-        return DateSchedule(self.start_date, self.payment_dates[mask], self.year_fractions[mask])
+        idx = self._first_future_idx(current_date)
+        return DateSchedule(self.start_date, self.payment_dates[idx:], self.year_fractions[idx:])
 
     def next_payment_idx(self, current_date: datetime):
-        assert self.payment_dates[-1] > current_date
-        mask = self.payment_dates > current_date
-        return len(self.payment_dates) - len(self.payment_dates[mask])
+        assert self.payment_dates[-1] > np.datetime64(current_date, "us")
+        return self._first_future_idx(current_date)
+
+    def _first_future_idx(self, current_date: datetime) -> int:
+        return int(np.searchsorted(self.payment_dates, np.datetime64(current_date, "us"), side="right"))
+
+    @staticmethod
+    def _read_only(array: np.array) -> np.array:
+        if array.flags.writeable:
+            array = array.view()
+            array.flags.writeable = False
+        return array
+
+
+class DateScheduleCache:
+    """
+    Interns date schedules keyed by (start date, end date, payment frequency, day count convention).
+    """
+
+    def __init__(self, max_size: int = 100_000) -> None:
+        self.max_size = max_size
+        self.schedules = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, build_schedule) -> DateSchedule:
+        schedule = self.schedules.get(key)
+        if schedule is not None:
+            self.hits += 1
+            return schedule
+        self.misses += 1
+        schedule = build_schedule()
+        if len(self.schedules) >= self.max_size:
+            # Evict the oldest entry, dictionaries preserve insertion order.
+            del self.schedules[next(iter(self.schedules))]
+        self.schedules[key] = schedule
+        return schedule
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups > 0 else 0.0
+
+    def clear(self) -> None:
+        self.schedules.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f"DateScheduleCache(size={len(self.schedules)}, hits={self.hits}, " \
+               f"misses={self.misses}, hit_rate={self.hit_rate:.2%})"
+
+
+SCHEDULE_CACHE = DateScheduleCache()
 
 
 class DateHelper:
@@ -35,11 +92,56 @@ class DateHelper:
         contrib_day = (end_date.day - start_date.day)
         return (contrib_year + contrib_month + contrib_day) / self.days_in_year
 
+    def accrual_factors(self, start_dates, end_dates) -> np.array:
+        # Vectorized accrual_factor, broadcasting over (batches of) schedules given as datetimes or day ordinals.
+        day_count = self.day_count_numbers(end_dates) - self.day_count_numbers(start_dates)
+        return day_count / self.days_in_year
+
     def tenors(self, current_date: datetime, future_dates: np.array, start_date: datetime = None):
-        tenors = [self.accrual_factor(current_date, x) for x in future_dates]
+        tenors = self.accrual_factors(current_date, future_dates)
         if start_date and current_date <= start_date:
-            tenors.insert(0, self.accrual_factor(current_date, start_date))
-        return np.array(tenors)
+            tenors = np.insert(tenors, 0, self.accrual_factor(current_date, start_date))
+        return tenors
+
+    def day_count_numbers(self, dates):
+        # Maps dates to integers whose differences are the day counts used by accrual_factor.
+        if isinstance(dates, datetime):
+            return self._day_count_number(dates.year, dates.month, dates.day)
+        dates = np.asarray(dates)
+        if dates.dtype.kind in "iM":
+            return self._day_count_number(*self.split_day_ordinals(self.to_day_ordinals(dates)))
+        day_counts = np.fromiter(
+            (self._day_count_number(x.year, x.month, x.day) for x in dates.ravel()), dtype=np.int64, count=dates.size
+        )
+        return day_counts.reshape(dates.shape)
+
+    def _day_count_number(self, year, month, day):
+        return self.days_in_year * year + self.days_in_month * month + day
+
+    @staticmethod
+    def to_day_ordinals(dates) -> np.array:
+        # Days since 1970-01-01, the time of day is dropped as it plays no role in accruals.
+        dates = np.asarray(dates)
+        if dates.dtype.kind == "i":
+            return dates.astype(np.int64)
+        elif dates.dtype.kind == "M":
+            return dates.astype("datetime64[D]").astype(np.int64)
+        ordinals = np.fromiter((x.toordinal() for x in dates.ravel()), dtype=np.int64, count=dates.size)
+        return ordinals.reshape(dates.shape) - EPOCH_ORDINAL
+
+    @staticmethod
+    def split_day_ordinals(day_ordinals: np.array) -> tuple:
+        # Civil calendar (year, month, day) from days since 1970-01-01 in integer arithmetic only.
+        shifted = day_ordinals + 719468
+        era = shifted // 146097
+        day_of_era = shifted - era * 146097
+        year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36524 - day_of_era // 146096) // 365
+        day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+        month_shifted = (5 * day_of_year + 2) // 153
+        day = day_of_year - (153 * month_shifted + 2) // 5 + 1
+        month = np.where(month_shifted < 10, month_shifted + 3, month_shifted - 9)
+        year = year_of_era + era * 400 + (month <= 2)
+        return year, month, day
 
     def tenor_from_string(self, tenor: str) -> float:
         units, metric = int(tenor[:-1]), tenor[-1]
@@ -68,11 +170,33 @@ class DateHelper:
 
 class DateScheduleGenerator:
 
-    def __init__(self, payment_freq: str, date_helper: DateHelper = DateHelper()):
+    def __init__(self, payment_freq: str, date_helper: DateHelper = DateHelper(),
+                 schedule_cache: DateScheduleCache = SCHEDULE_CACHE):
         self.date_helper = date_helper
         self.payment_freq = payment_freq
         self.payment_freq_delta = None
-        self.date_schedule = self._get_scheduler(payment_freq)
+        self.schedule_cache = schedule_cache
+        self.scheduler = self._get_scheduler(payment_freq)
+
+    def __getstate__(self) -> dict:
+        # The process-wide cache is neither pickled nor copied with the generator, copies re-attach to it.
+        state = dict(self.__dict__)
+        state["global_schedule_cache"] = state["schedule_cache"] is SCHEDULE_CACHE
+        if state["global_schedule_cache"]:
+            state["schedule_cache"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        state = dict(state)
+        if state.pop("global_schedule_cache", False):
+            state["schedule_cache"] = SCHEDULE_CACHE
+        self.__dict__.update(state)
+
+    def date_schedule(self, start_date: datetime, end_date: datetime) -> DateSchedule:
+        if self.schedule_cache is None:
+            return self.scheduler(start_date, end_date)
+        key = (start_date, end_date, self.payment_freq, self.date_helper.days_in_year, self.date_helper.days_in_month)
+        return self.schedule_cache.get(key, lambda: self.scheduler(start_date, end_date))
 
     def _get_scheduler(self, payment_freq: str):
         if payment_freq == "Single":
@@ -83,24 +207,32 @@ class DateScheduleGenerator:
 
     def date_schedule_single(self, start_date: datetime, end_date: datetime) -> DateSchedule:
         accrual_factor = self.date_helper.accrual_factor(start_date, end_date)
-        return DateSchedule(start_date, np.array([end_date]), np.array([accrual_factor]))
+        return DateSchedule(start_date, np.array([end_date], dtype="datetime64[us]"), np.array([accrual_factor]))
 
     def date_schedule_multi(self, start_date: datetime, end_date: datetime) -> DateSchedule:
         assert end_date >= start_date + self.payment_freq_delta  # Otherwise we get inconsistencies.
-        payment_dates, year_fractions = [], []
-        counter = 0
-        while True:
-            payment_date = end_date - counter * self.payment_freq_delta
-            if start_date < payment_date:
-                payment_dates.insert(0, payment_date)
-                if counter > 0:
-                    payment_date_old = payment_dates[counter - 1]
-                    payment_date_new = payment_dates[counter]
-                    year_fraction = self.date_helper.accrual_factor(payment_date_old, payment_date_new)
-                    year_fractions.insert(0, year_fraction)
-                counter += 1
-            else:
-                year_fraction = self.date_helper.accrual_factor(start_date, payment_dates[0])
-                year_fractions.insert(0, year_fraction)
-                break
-        return DateSchedule(start_date, np.array(payment_dates), np.array(year_fractions))
+        # Payment dates are rolled back from the end date, i.e. end_date - k * payment_freq_delta for k = 0, 1, ...
+        start, end = np.datetime64(start_date, "us"), np.datetime64(end_date, "us")
+        end_day = end.astype("datetime64[D]")
+        time_of_day = end - end_day
+        delta_months = 12 * self.payment_freq_delta.years + self.payment_freq_delta.months
+        if delta_months > 0:
+            payment_days = self._roll_back_months(start, end_day, delta_months)
+        else:
+            n_periods = (end_day - start.astype("datetime64[D]")).astype(np.int64) // self.payment_freq_delta.days
+            payment_days = end_day - self.payment_freq_delta.days * np.arange(n_periods + 1)
+        payment_dates = (payment_days + time_of_day)[::-1]
+        payment_dates = payment_dates[payment_dates > start]
+        accrual_start_dates = np.concatenate([[start], payment_dates[:-1]])
+        year_fractions = self.date_helper.accrual_factors(accrual_start_dates, payment_dates)
+        return DateSchedule(start_date, payment_dates, year_fractions)
+
+    @staticmethod
+    def _roll_back_months(start: np.datetime64, end_day: np.datetime64, delta_months: int) -> np.array:
+        # Same as relativedelta: step back whole months and clip the day to the end of the month.
+        end_month = end_day.astype("datetime64[M]")
+        n_periods = (end_month - start.astype("datetime64[M]")).astype(np.int64) // delta_months
+        months = end_month - delta_months * np.arange(n_periods + 1)
+        month_lengths = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+        day = (end_day - end_month.astype("datetime64[D]")).astype(np.int64)
+        return months.astype("datetime64[D]") + np.minimum(day, month_lengths - 1)
@@ -0,0 +1,119 @@
+"""
+This module contains a batch valuation of portfolios against economy snapshots,
+sharded over a process pool by ranges of instruments and by economy.
+"""
+
+from __future__ import annotations
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from economy.base import Economy
+from exposures.base import Exposure
+from instruments.portfolio import Portfolio
+from mandate.base import Mandate
+
+# Inputs of a worker process, set once by _init_worker instead of being sent with every shard.
+_worker_inputs = {}
+
+
+def _init_worker(portfolios: List[Portfolio], economies: List[Economy],
+                 exposures_and_targets: List[Tuple[Exposure, float]]) -> None:
+    _worker_inputs["portfolios"] = portfolios
+    _worker_inputs["economies"] = economies
+    # Exposures only, the instrument generators of a mandate are closures and not needed for valuations.
+    _worker_inputs["mandate"] = Mandate(exposures_and_targets, []) if exposures_and_targets is not None else None
+    _worker_inputs["shard_portfolios"] = {}
+
+
+def _value_shard(shard: Tuple[int, int, int, int]) -> Tuple[Tuple[int, int, int, int], np.array, np.array]:
+    # Values the instruments [start, stop) of a portfolio in one economy. The shard portfolio is kept,
+    # such that its book is built once per worker for all economies.
+    portfolio_idx, economy_idx, start, stop = shard
+    shard_portfolios = _worker_inputs["shard_portfolios"]
+    if (portfolio_idx, start) not in shard_portfolios:
+        instruments = _worker_inputs["portfolios"][portfolio_idx].instruments[start:stop]
+        shard_portfolios[(portfolio_idx, start)] = Portfolio(list(instruments))
+    portfolio = shard_portfolios[(portfolio_idx, start)]
+    economy = _worker_inputs["economies"][economy_idx]
+    values = portfolio.instrument_values(economy)
+    mandate = _worker_inputs["mandate"]
+    exposures = mandate.trade_exposures(portfolio, economy) if mandate is not None else np.zeros(0)
+    return shard, values, exposures
+
+
+class BatchValuation:
+
+    def __init__(self, portfolios: List[Portfolio], economies: List[Economy], mandate: Mandate = None,
+                 n_workers: int = None, shard_size: int = 10_000) -> None:
+        self.portfolios = portfolios
+        self.economies = economies
+        self.mandate = mandate
+        self.n_workers = os.cpu_count() if n_workers is None else n_workers
+        self.shard_size = shard_size
+
+    def shards(self) -> List[Tuple[int, int, int, int]]:
+        # Instrument ranges are the outer loop, such that consecutive shards of a worker reuse its shard portfolios.
+        shards = []
+        for portfolio_idx, portfolio in enumerate(self.portfolios):
+            for start in range(0, len(portfolio.instruments), self.shard_size):
+                stop = min(start + self.shard_size, len(portfolio.instruments))
+                shards += [(portfolio_idx, economy_idx, start, stop) for economy_idx in range(len(self.economies))]
+        return shards
+
+    def run(self) -> BatchResult:
+        exposures_and_targets = None if self.mandate is None else list(zip(self.mandate.exposures, self.mandate.targets))
+        init_args = (self.portfolios, self.economies, exposures_and_targets)
+        if self.n_workers <= 1:
+            _init_worker(*init_args)
+            results = [_value_shard(shard) for shard in self.shards()]
+        else:
+            with ProcessPoolExecutor(self.n_workers, initializer=_init_worker, initargs=init_args) as executor:
+                # Large chunks keep the shards of an instrument range on the same worker.
+                chunk_size = max(1, len(self.economies))
+                results = list(executor.map(_value_shard, self.shards(), chunksize=chunk_size))
+        return self._collect(results)
+
+    def _collect(self, results: list) -> BatchResult:
+        n_exposures = 0 if self.mandate is None else self.mandate.n_exposures
+        values = [np.zeros((len(self.economies), len(portfolio.instruments))) for portfolio in self.portfolios]
+        exposures = np.zeros((len(self.portfolios), len(self.economies), n_exposures))
+        for (portfolio_idx, economy_idx, start, stop), shard_values, shard_exposures in results:
+            values[portfolio_idx][economy_idx, start:stop] = shard_values
+            # Exposures are linear in the positions, hence the exposures of the shards add up.
+            exposures[portfolio_idx, economy_idx] += shard_exposures
+        labels = [] if self.mandate is None else self.mandate.exposure_labels
+        return BatchResult(values, exposures, labels)
+
+
+class BatchResult:
+    """
+    Instrument values per portfolio with shape (economies x instruments),
+    and mandate exposures with shape (portfolios x economies x exposures).
+    """
+
+    def __init__(self, values: List[np.array], exposures: np.array, exposure_labels: List[str]) -> None:
+        self.values = values
+        self.exposures = exposures
+        self.exposure_labels = exposure_labels
+
+    @property
+    def portfolio_values(self) -> np.array:
+        # Shape (portfolios x economies).
+        return np.stack([np.sum(values, axis=1) for values in self.values])
+
+    def save(self, output_path: str) -> None:
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        arrays: Dict[str, np.array] = {f"values_{k}": values for k, values in enumerate(self.values)}
+        np.savez_compressed(output_path, exposures=self.exposures, exposure_labels=np.array(self.exposure_labels),
+                            **arrays)
+
+    @classmethod
+    def load(cls, output_path: str) -> BatchResult:
+        with np.load(output_path) as arrays:
+            n_portfolios = sum(name.startswith("values_") for name in arrays.files)
+            values = [arrays[f"values_{k}"] for k in range(n_portfolios)]
+            return cls(values, arrays["exposures"], list(arrays["exposure_labels"]))